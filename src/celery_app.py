@@ -1,24 +1,49 @@
 from unittest import result
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from helpers.config import get_settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
+from stores.llm.ContextPacker import ContextPacker
+from stores.cache import CachedEmbeddingProvider, EmbeddingCacheFactory
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from utils.metrics import setup_metrics
+import asyncio
+import logging
+import threading
 
 settings = get_settings()
+logger = logging.getLogger("celery.task")
 
+# clients that are thread-safe and not bound to an event loop (LLM and
+# vector DB clients, the embedding cache, the context packer) are built once
+# per worker process and shared by its task threads
+_shared_utilities = None
+_shared_utilities_lock = threading.Lock()
+_context_packer = None
+_context_packer_lock = threading.Lock()
 
-async def get_setup_utilities():
-    settings = get_settings()
-    postgress_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DB}"
-    db_engine = create_async_engine(postgress_conn)
-    db_client = sessionmaker(
-        bind=db_engine, expire_on_commit=False, class_=AsyncSession
-    )
+# each task thread keeps its own event loop and async DB engine for the
+# lifetime of the worker process; the engine's connection pool is bound to
+# the loop it was created on, so neither can be shared across threads
+_worker_local = threading.local()
+_worker_states = []
+_worker_states_lock = threading.Lock()
 
+
+def get_shared_utilities() -> tuple:
+    """Builds the process-wide clients on first use."""
+    global _shared_utilities
+    with _shared_utilities_lock:
+        if _shared_utilities is None:
+            _shared_utilities = create_shared_utilities()
+        return _shared_utilities
+
+
+def create_shared_utilities() -> tuple:
+    settings = get_settings()
     llm_provider_factory = LLMProviderFactory(settings)
     vector_db_factory = VectorDBProviderFactory(settings)
     generation_client = llm_provider_factory.create(settings.GENERATION_BACKEND)
@@ -28,14 +53,19 @@ async def get_setup_utilities():
         model_id=settings.EMBEDDING_MODEL_ID,
         embedding_size=settings.EMBEDDING_MODEL_SIZE,
     )
+    embedding_cache = EmbeddingCacheFactory(settings).create()
+    if embedding_cache:
+        embedding_client = CachedEmbeddingProvider(
+            provider=embedding_client,
+            provider_name=settings.EMBEDDING_BACKEND,
+            cache=embedding_cache,
+        )
     vector_db_client = vector_db_factory.create(proivder=settings.VECTOR_DB_BACKEND)
     vector_db_client.connect()
     template_parser = TemplateParser(
         language=settings.PRIMARY_LANG, default_language=settings.DEFAULT_LANG
     )
     return (
-        db_engine,
-        db_client,
         llm_provider_factory,
         vector_db_factory,
         generation_client,
@@ -45,6 +75,127 @@ async def get_setup_utilities():
     )
 
 
+async def get_setup_utilities():
+    settings = get_settings()
+    db_engine = create_async_engine(settings.postgres_async_dsn)
+    db_client = sessionmaker(
+        bind=db_engine, expire_on_commit=False, class_=AsyncSession
+    )
+    return (db_engine, db_client, *get_shared_utilities())
+
+
+def get_worker_state() -> dict:
+    state = getattr(_worker_local, "state", None)
+    if state is None or state["loop"].is_closed():
+        state = {"loop": asyncio.new_event_loop(), "utilities": None}
+        _worker_local.state = state
+        with _worker_states_lock:
+            _worker_states.append(state)
+    return state
+
+
+def run_worker_task(coroutine):
+    """Runs a task coroutine on the calling thread's persistent loop.
+
+    When the task fails, the thread's DB engine is disposed and rebuilt by
+    the next task, so a dropped connection does not poison the thread.
+    """
+    state = get_worker_state()
+    loop = state["loop"]
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine)
+    except Exception:
+        utilities, state["utilities"] = state["utilities"], None
+        if utilities is not None:
+            loop.run_until_complete(close_worker_utilities(utilities))
+        raise
+
+
+async def get_worker_utilities():
+    """Same tuple as `get_setup_utilities`: the DB engine is built once per
+    task thread, the other clients once per process."""
+    state = get_worker_state()
+    if state["utilities"] is None:
+        state["utilities"] = await get_setup_utilities()
+    return state["utilities"]
+
+
+def get_context_packer() -> ContextPacker:
+    """The worker process's `ContextPacker`, loading the tokenizer once."""
+    global _context_packer
+    with _context_packer_lock:
+        if _context_packer is None:
+            settings = get_settings()
+            _context_packer = ContextPacker(
+                max_tokens=settings.RAG_CONTEXT_MAX_TOKENS,
+                dedupe_threshold=settings.RAG_CONTEXT_DEDUPE_THRESHOLD,
+                encoding_name=settings.RAG_TOKENIZER_ENCODING,
+            )
+        return _context_packer
+
+
+async def close_worker_utilities(utilities):
+    try:
+        await utilities[0].dispose()
+    except Exception as e:
+        logger.error(f"Error during cleanup: {e}")
+
+
+async def close_shared_utilities(utilities):
+    llm_provider_factory, embedding_client, vector_db_client = (
+        utilities[0],
+        utilities[3],
+        utilities[4],
+    )
+    try:
+        await llm_provider_factory.close()
+        if isinstance(embedding_client, CachedEmbeddingProvider):
+            embedding_client.cache.close()
+        if vector_db_client:
+            vector_db_client.disconnect()
+    except Exception as e:
+        logger.error(f"Error during cleanup: {e}")
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    global _worker_local, _worker_states, _shared_utilities, _context_packer
+    # a forked child inherits the parent's loops and sockets; start clean
+    _worker_local = threading.local()
+    _worker_states = []
+    _shared_utilities = None
+    _context_packer = None
+    try:
+        get_context_packer()
+        get_shared_utilities()
+    except Exception as e:
+        # tasks retry the setup lazily
+        logger.error(f"Error setting up worker resources: {e}")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    global _shared_utilities
+    with _worker_states_lock:
+        states = list(_worker_states)
+        _worker_states.clear()
+    for state in states:
+        loop = state["loop"]
+        if loop.is_closed() or loop.is_running():
+            continue
+        if state["utilities"] is not None:
+            loop.run_until_complete(close_worker_utilities(state["utilities"]))
+            state["utilities"] = None
+        loop.close()
+
+    with _shared_utilities_lock:
+        utilities, _shared_utilities = _shared_utilities, None
+    if utilities is not None:
+        asyncio.run(close_shared_utilities(utilities))
+
+
 celery_app = Celery(
     "rag_app",
     broker=settings.CELERY_BROKER_URL,
@@ -69,6 +220,9 @@ celery_app.conf.update(
         "tasks.main_service.send_email_report": {"queue": "email_reports"},
         "tasks.file_processing.process_project_files": {"queue": "file_processing"},
         "tasks.data_indexing.index_data_content": {"queue": "data_indexing"},
+        "tasks.data_indexing.index_data_content_sharded": {"queue": "data_indexing"},
+        "tasks.data_indexing.index_data_shard": {"queue": "data_indexing"},
+        "tasks.data_indexing.finalize_data_indexing": {"queue": "data_indexing"},
     },
 )
 
@@ -4,20 +4,43 @@ from openai import embeddings
 from .BaseController import BaseController
 from models.db_schemas import Project, DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnum
+from stores.llm.ContextPacker import ContextPacker
+from models.ChunkDataModel import ChunkDataModel
+from stores.rerank import RerankInterface
+from utils.metrics import RERANK_LATENCY
 from typing import List
 import asyncio
 import json
+import logging
 
 
 class NLPController(BaseController):
     def __init__(
-        self, vector_db_client, generation_client, embedding_client, template_parser
+        self,
+        vector_db_client,
+        generation_client,
+        embedding_client,
+        template_parser,
+        answer_cache=None,
+        context_packer: ContextPacker = None,
+        chunk_model: ChunkDataModel = None,
+        reranker: RerankInterface = None,
     ):
         super().__init__()
+        self.logger = logging.getLogger(__name__)
         self.vectordb_client = vector_db_client
         self.generation_client = generation_client
         self.embedding_client = embedding_client
         self.template_parser = template_parser
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer or ContextPacker(
+            max_tokens=self.settings.RAG_CONTEXT_MAX_TOKENS,
+            dedupe_threshold=self.settings.RAG_CONTEXT_DEDUPE_THRESHOLD,
+            encoding_name=self.settings.RAG_TOKENIZER_ENCODING,
+        )
+        # lexical half of hybrid search; dense only when not given
+        self.chunk_model = chunk_model
+        self.reranker = reranker
 
     def create_collection_name(self, project_id: str):
         return f"collection_{project_id}".strip()
@@ -33,6 +56,25 @@ class NLPController(BaseController):
         )
         return json.loads(json.dumps(collection_info, default=lambda x: x.__dict__))
 
+    def delete_from_vector_db(self, project: Project, chunks_ids: list):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return self.vectordb_client.delete_by_ids(
+            collection_name=collection_name, record_ids=chunks_ids
+        )
+
+    def ensure_vector_db_collection(self, project: Project, do_reset: bool = False):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        if not do_reset and self.vectordb_client.is_collection_exists(
+            collection_name=collection_name
+        ):
+            return True
+        return self.vectordb_client.create_collection(
+            collection_name=collection_name,
+            do_reset=do_reset,
+            embedding_size=self.embedding_client.embedding_size,
+            quantization=self.settings.VECTOR_DB_QUANTIZATION,
+        )
+
     def index_into_vector_db(
         self,
         project: Project,
@@ -40,25 +82,32 @@ class NLPController(BaseController):
         chunks_ids: list,
         do_reset: bool = False,
     ):
-        collection_name = self.create_collection_name(project_id=project.project_id)
-        texts = [c.chunk_text for c in chunks]
-        metadata = [c.chunk_metadata for c in chunks]
-        vectors = [
-            self.embedding_client.embed_text(
-                text=text, document_type=DocumentTypeEnum.DOCUMENT.value
-            )
-            for text in texts
-        ]
+        vectors = self.embed_chunks(chunks=chunks)
+        if vectors is None:
+            return False
 
-        _ = self.vectordb_client.create_collection(
-            collection_name=collection_name,
-            do_reset=do_reset,
-            embedding_size=self.embedding_client.embedding_size,
+        _ = self.ensure_vector_db_collection(project=project, do_reset=do_reset)
+        return self.insert_into_vector_db(
+            project=project, chunks=chunks, vectors=vectors, chunks_ids=chunks_ids
         )
-        _ = self.vectordb_client.insert_many(
+
+    def embed_chunks(self, chunks: List[DataChunk]):
+        vectors = self.embedding_client.embed_texts(
+            texts=[c.chunk_text for c in chunks],
+            document_type=DocumentTypeEnum.DOCUMENT.value,
+        )
+        if not vectors or any(vector is None for vector in vectors):
+            return None
+        return vectors
+
+    def insert_into_vector_db(
+        self, project: Project, chunks: List[DataChunk], vectors: list, chunks_ids: list
+    ):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return self.vectordb_client.insert_many(
             collection_name=collection_name,
-            texts=texts,
-            metadata=metadata,
+            texts=[c.chunk_text for c in chunks],
+            metadata=[c.chunk_metadata for c in chunks],
             vectors=vectors,
             record_ids=chunks_ids,
         )
@@ -90,20 +139,42 @@ class NLPController(BaseController):
 
         if not retrieved_documents or len(retrieved_documents) == 0:
             return None
-        system_prompt = self.template_parser.get("rag", "system_prompt")
-        document_prompts = "\n".join(
-            [
-                self.template_parser.get(
-                    "rag",
-                    "document_prompt",
-                    {"doc_num": idx + 1, "chunk_text": doc.text},
-                )
-                for idx, doc in enumerate(retrieved_documents)
-            ]
+        full_prompt, chat_history = self.construct_rag_prompt(
+            query=query, retrieved_documents=retrieved_documents
         )
+
+        answer = self.generation_client.generate_text(
+            prompt=full_prompt, chat_history=chat_history, max_output_tokens=1000
+        )
+
+        return answer, full_prompt, chat_history
+
+    def construct_rag_prompt(self, query: str, retrieved_documents: list):
+        system_prompt = self.template_parser.get("rag", "system_prompt")
         footer_prompt = self.template_parser.get(
             "rag", "footer_prompt", {"query": query}
         )
+        # the system prompt and the question are always sent; documents
+        # fill whatever budget is left
+        retrieved_documents = self.context_packer.pack(
+            documents=retrieved_documents,
+            fixed_prompts=[system_prompt, footer_prompt],
+            document_overhead=self.template_parser.get(
+                "rag",
+                "document_prompt",
+                {"doc_num": len(retrieved_documents), "chunk_text": ""},
+            ),
+        )
+        document_prompts = "\n".join(
+            self.template_parser.render_many(
+                "rag",
+                "document_prompt",
+                [
+                    {"doc_num": idx + 1, "chunk_text": doc.text}
+                    for idx, doc in enumerate(retrieved_documents)
+                ],
+            )
+        )
         chat_history = [
             self.generation_client.construct_prompt(
                 prompt=system_prompt, role=self.generation_client.enums.SYSTEM.value
@@ -112,8 +183,379 @@ class NLPController(BaseController):
 
         full_prompt = "\n\n".join([document_prompts, footer_prompt])
 
-        answer = self.generation_client.generate_text(
-            prompt=full_prompt, chat_history=chat_history, max_output_tokens=1000
+        return full_prompt, chat_history
+
+    # ---------- async variants used by the FastAPI routers ----------
+
+    async def vector_db_collection_info_async(self, project: Project):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        collection_info = await self.vectordb_client.get_collection_info(
+            collection_name=collection_name
+        )
+        return json.loads(json.dumps(collection_info, default=lambda x: x.__dict__))
+
+    async def search_db_collection_async(
+        self, project: Project, text: str, limit: int = 10, vector: list = None
+    ):
+        if self.chunk_model is None or not self.settings.HYBRID_SEARCH_ENABLED:
+            return await self.search_dense_async(
+                project=project, text=text, limit=limit, vector=vector
+            )
+
+        candidates_limit = max(limit, self.settings.HYBRID_SEARCH_CANDIDATES)
+        # the full-text query runs while the question is embedded and searched
+        dense_results, lexical_results = await asyncio.gather(
+            self.search_dense_async(
+                project=project, text=text, limit=candidates_limit, vector=vector
+            ),
+            self.search_lexical_async(
+                project=project, text=text, limit=candidates_limit
+            ),
+        )
+        results = self.fuse_search_results(
+            dense_results=dense_results or [],
+            lexical_results=lexical_results or [],
+            limit=limit,
+        )
+
+        if not results:
+            return False
+
+        return results
+
+    async def retrieve_documents_async(
+        self, project: Project, query: str, limit: int = 10, vector: list = None
+    ):
+        """Documents for the prompt: with a reranker, the top
+        `RERANK_CANDIDATES` search hits are reranked down to `limit`."""
+        if self.reranker is None:
+            return await self.search_db_collection_async(
+                project=project, text=query, limit=limit, vector=vector
+            )
+
+        candidates = await self.search_db_collection_async(
+            project=project,
+            text=query,
+            limit=max(limit, self.settings.RERANK_CANDIDATES),
+            vector=vector,
+        )
+        if not candidates:
+            return candidates
+        return await self.rerank_documents_async(
+            query=query, documents=candidates, top_k=limit
+        )
+
+    async def rerank_documents_async(self, query: str, documents: list, top_k: int):
+        with RERANK_LATENCY.labels(backend=self.settings.RERANK_BACKEND).time():
+            reranked_documents = await self.reranker.rerank(
+                query=query, documents=documents, top_k=top_k
+            )
+        if reranked_documents is None:
+            # fall back to the retrieval order
+            return documents[:top_k]
+        return reranked_documents
+
+    async def search_lexical_async(self, project: Project, text: str, limit: int = 10):
+        try:
+            return await self.chunk_model.search_project_chunks(
+                project_id=project.project_id,
+                text=text,
+                limit=limit,
+                stopword_config=self.settings.HYBRID_SEARCH_STOPWORD_CONFIG,
+                max_terms=self.settings.HYBRID_SEARCH_MAX_TERMS,
+            )
+        except Exception as e:
+            # e.g. the text search migration was not applied yet
+            self.logger.error(f"Error in full-text chunk search: {e}")
+            return []
+
+    def fuse_search_results(
+        self, dense_results: list, lexical_results: list, limit: int = 10
+    ) -> list:
+        """Reciprocal-rank fusion: a document scores the sum of
+        1 / (k + rank) over the result lists it appears in, so agreement
+        between retrievers counts and their raw scores never need to be
+        comparable.
+
+        `score` of a fused document is its RRF score (at most
+        2 / (k + 1), ~0.033 with k=60); the vector similarity of dense hits
+        is kept in `dense_score`.
+        """
+        rrf_k = self.settings.HYBRID_SEARCH_RRF_K
+        fused = {}
+        dense_results = [
+            doc.model_copy(update={"dense_score": doc.score}) for doc in dense_results
+        ]
+        for results in (dense_results, lexical_results):
+            for rank, doc in enumerate(results, start=1):
+                key = doc.chunk_id if doc.chunk_id is not None else doc.text
+                score, fused_doc = fused.get(key, (0.0, doc))
+                fused[key] = (score + 1 / (rrf_k + rank), fused_doc)
+
+        ranked = sorted(fused.values(), key=lambda item: item[0], reverse=True)
+        return [
+            fused_doc.model_copy(update={"score": score})
+            for score, fused_doc in ranked[:limit]
+        ]
+
+    async def search_dense_async(
+        self, project: Project, text: str, limit: int = 10, vector: list = None
+    ):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        if vector is None:
+            vector = await self.embedding_client.embed_text(
+                text=text,
+                document_type=DocumentTypeEnum.QUERY.value,
+            )
+
+        if not vector or len(vector) == 0:
+            return False
+        results = await self.vectordb_client.search_by_vector(
+            collection_name=collection_name, vector=vector, limit=limit
+        )
+
+        if not results:
+            return False
+
+        return results
+
+    async def answer_rag_questions_async(
+        self, project: Project, query: str, limit: int = 10
+    ):
+        vector = await self.embedding_client.embed_text(
+            text=query,
+            document_type=DocumentTypeEnum.QUERY.value,
+        )
+        if not vector or len(vector) == 0:
+            return None
+
+        cache_scope = None
+        if self.answer_cache:
+            cache_scope = await self.answer_cache.get_scope(
+                collection_name=self.create_collection_name(
+                    project_id=project.project_id
+                ),
+                limit=limit,
+            )
+        if cache_scope:
+            cached_answer = self.answer_cache.lookup(scope=cache_scope, vector=vector)
+            if cached_answer:
+                return cached_answer
+
+        retrieved_documents = await self.retrieve_documents_async(
+            project=project, query=query, limit=limit, vector=vector
+        )
+
+        if not retrieved_documents or len(retrieved_documents) == 0:
+            return None
+        full_prompt, chat_history = self.construct_rag_prompt(
+            query=query, retrieved_documents=retrieved_documents
+        )
+
+        answer = await self.generation_client.generate_text(
+            prompt=full_prompt,
+            chat_history=chat_history,
+            max_output_tokens=1000,
         )
 
+        if answer and cache_scope:
+            self.answer_cache.store(
+                scope=cache_scope,
+                vector=vector,
+                value=(answer, full_prompt, chat_history),
+            )
+
         return answer, full_prompt, chat_history
+
+    async def answer_rag_questions_stream_async(
+        self, project: Project, query: str, limit: int = 10
+    ):
+        retrieved_documents = await self.retrieve_documents_async(
+            project=project, query=query, limit=limit
+        )
+
+        if not retrieved_documents or len(retrieved_documents) == 0:
+            return None
+        full_prompt, chat_history = self.construct_rag_prompt(
+            query=query, retrieved_documents=retrieved_documents
+        )
+
+        # nothing is sent to the model until the caller starts iterating
+        token_stream = self.generation_client.generate_text_stream(
+            prompt=full_prompt,
+            chat_history=chat_history,
+            max_output_tokens=1000,
+        )
+
+        return retrieved_documents, token_stream, full_prompt, chat_history
+
+    # ---------- batch variants: one embedding call and one search for many queries ----------
+
+    async def embed_queries_async(self, texts: list) -> list:
+        vectors = await self.embedding_client.embed_texts(
+            texts=texts, document_type=DocumentTypeEnum.QUERY.value
+        )
+        if not vectors:
+            return [None] * len(texts)
+        return vectors
+
+    async def search_db_collection_batch_async(
+        self, project: Project, texts: list, limit: int = 10, vectors: list = None
+    ) -> list:
+        """One result list per text, in input order; a query whose embedding
+        or search failed gets an empty list."""
+        if self.chunk_model is None or not self.settings.HYBRID_SEARCH_ENABLED:
+            return await self.search_dense_batch_async(
+                project=project, texts=texts, limit=limit, vectors=vectors
+            )
+
+        candidates_limit = max(limit, self.settings.HYBRID_SEARCH_CANDIDATES)
+        dense_batch, lexical_batch = await asyncio.gather(
+            self.search_dense_batch_async(
+                project=project, texts=texts, limit=candidates_limit, vectors=vectors
+            ),
+            self.search_lexical_batch_async(
+                project=project, texts=texts, limit=candidates_limit
+            ),
+        )
+        return [
+            self.fuse_search_results(
+                dense_results=dense_results,
+                lexical_results=lexical_results,
+                limit=limit,
+            )
+            for dense_results, lexical_results in zip(dense_batch, lexical_batch)
+        ]
+
+    async def search_dense_batch_async(
+        self, project: Project, texts: list, limit: int = 10, vectors: list = None
+    ) -> list:
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        if vectors is None:
+            vectors = await self.embed_queries_async(texts=texts)
+
+        batch_results = [[] for _ in texts]
+        searchable = [idx for idx, vector in enumerate(vectors) if vector]
+        if not searchable:
+            return batch_results
+        results = await self.vectordb_client.search_by_vectors(
+            collection_name=collection_name,
+            vectors=[vectors[idx] for idx in searchable],
+            limit=limit,
+        )
+        for idx, query_results in zip(searchable, results or []):
+            batch_results[idx] = query_results or []
+        return batch_results
+
+    async def search_lexical_batch_async(
+        self, project: Project, texts: list, limit: int = 10
+    ) -> list:
+        try:
+            return await self.chunk_model.search_project_chunks_batch(
+                project_id=project.project_id,
+                texts=texts,
+                limit=limit,
+                stopword_config=self.settings.HYBRID_SEARCH_STOPWORD_CONFIG,
+                max_terms=self.settings.HYBRID_SEARCH_MAX_TERMS,
+            )
+        except Exception as e:
+            self.logger.error(f"Error in full-text chunk search: {e}")
+            return [[] for _ in texts]
+
+    async def retrieve_documents_batch_async(
+        self, project: Project, queries: list, limit: int = 10, vectors: list = None
+    ) -> list:
+        if self.reranker is None:
+            return await self.search_db_collection_batch_async(
+                project=project, texts=queries, limit=limit, vectors=vectors
+            )
+
+        candidates_batch = await self.search_db_collection_batch_async(
+            project=project,
+            texts=queries,
+            limit=max(limit, self.settings.RERANK_CANDIDATES),
+            vectors=vectors,
+        )
+        return await asyncio.gather(
+            *(
+                self.rerank_documents_async(
+                    query=query, documents=candidates, top_k=limit
+                )
+                for query, candidates in zip(queries, candidates_batch)
+            )
+        )
+
+    async def answer_rag_questions_batch_async(
+        self, project: Project, queries: list, limit: int = 10
+    ) -> list:
+        """`answer_rag_questions_async` for many queries. Returns one
+        `(answer, full_prompt, chat_history)` or None per query, in input
+        order; at most `BATCH_ANSWER_CONCURRENCY` generations run at once."""
+        vectors = await self.embed_queries_async(texts=queries)
+
+        cache_scope = None
+        if self.answer_cache:
+            cache_scope = await self.answer_cache.get_scope(
+                collection_name=self.create_collection_name(
+                    project_id=project.project_id
+                ),
+                limit=limit,
+            )
+
+        answers = [None] * len(queries)
+        pending = []
+        for idx, vector in enumerate(vectors):
+            if not vector:
+                continue
+            if cache_scope:
+                cached_answer = self.answer_cache.lookup(
+                    scope=cache_scope, vector=vector
+                )
+                if cached_answer:
+                    answers[idx] = cached_answer
+                    continue
+            pending.append(idx)
+        if not pending:
+            return answers
+
+        documents_batch = await self.retrieve_documents_batch_async(
+            project=project,
+            queries=[queries[idx] for idx in pending],
+            limit=limit,
+            vectors=[vectors[idx] for idx in pending],
+        )
+        semaphore = asyncio.Semaphore(self.settings.BATCH_ANSWER_CONCURRENCY)
+
+        async def answer_query(idx: int, retrieved_documents: list):
+            if not retrieved_documents:
+                return
+            full_prompt, chat_history = self.construct_rag_prompt(
+                query=queries[idx], retrieved_documents=retrieved_documents
+            )
+            try:
+                async with semaphore:
+                    answer = await self.generation_client.generate_text(
+                        prompt=full_prompt,
+                        chat_history=chat_history,
+                        max_output_tokens=1000,
+                    )
+            except Exception as e:
+                # one failed generation must not fail the whole batch
+                self.logger.error(f"Error answering batch query {idx}: {e}")
+                return
+            if not answer:
+                return
+            answers[idx] = (answer, full_prompt, chat_history)
+            if cache_scope:
+                self.answer_cache.store(
+                    scope=cache_scope, vector=vectors[idx], value=answers[idx]
+                )
+
+        await asyncio.gather(
+            *(
+                answer_query(idx, retrieved_documents)
+                for idx, retrieved_documents in zip(pending, documents_batch)
+            )
+        )
+        return answers
@@ -4,8 +4,13 @@ from .BaseController import BaseController
 from .ProjectController import ProjectController
 import os
 from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from models import ProcessEnum
+from models import ProcessEnum, ChunkBatchEventEnum
+from typing import Iterator
+from queue import Full
+import hashlib
+import fitz
 
 
 class ProcessController(BaseController):
@@ -28,6 +33,27 @@ class ProcessController(BaseController):
         if not os.path.exists(file_path):
             return None
 
+    def get_file_hash(self, file_id: str, block_size: int = 1 << 20) -> str:
+        file_path = os.path.join(self.project_path, file_id)
+        if not os.path.exists(file_path):
+            return None
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def get_processing_fingerprint(
+        self, file_id: str, chunk_size: int, overlap_size: int
+    ) -> dict:
+        """Everything that determines a file's chunks; stored on the asset so
+        unchanged files can be skipped on re-processing."""
+        return {
+            "content_hash": self.get_file_hash(file_id=file_id),
+            "chunk_size": chunk_size,
+            "overlap_size": overlap_size,
+        }
+
     def get_file_content(self, file_id: str):
         loader = self.get_file_lader(file_id)
         if loader:
@@ -51,3 +77,163 @@ class ProcessController(BaseController):
             file_content_texts, metadatas=file_content_metadata
         )
         return chunks
+
+    def iter_file_pages(
+        self, file_id: str, text_block_size: int = 65536
+    ) -> Iterator[Document]:
+        """Yield a file one page (PDF) or one text block (TXT) at a time."""
+        file_ext = self.get_file_extension(file_id)
+        file_path = os.path.join(self.project_path, file_id)
+        if not os.path.exists(file_path):
+            return
+        if file_ext == ProcessEnum.TXT.value:
+            yield from self.iter_text_blocks(file_path, text_block_size)
+        elif file_ext == ProcessEnum.PDF.value:
+            yield from self.iter_pdf_pages(file_path)
+
+    def iter_text_blocks(
+        self, file_path: str, text_block_size: int
+    ) -> Iterator[Document]:
+        with open(file_path, encoding="utf8") as file:
+            while True:
+                block = file.read(text_block_size)
+                if not block:
+                    break
+                yield Document(page_content=block, metadata={"source": file_path})
+
+    def iter_pdf_pages(self, file_path: str) -> Iterator[Document]:
+        # same metadata as PyMuPDFLoader, whose parser materialises every page
+        with fitz.open(file_path) as doc:
+            doc_metadata = {
+                k: v for k, v in doc.metadata.items() if type(v) in [str, int]
+            }
+            for page in doc:
+                page_text = page.get_text()
+                if page_text and not page_text[-1].isspace():
+                    page_text += "\n"
+                yield Document(
+                    page_content=page_text,
+                    metadata={
+                        "source": file_path,
+                        "file_path": file_path,
+                        "page": page.number,
+                        "total_pages": len(doc),
+                        **doc_metadata,
+                    },
+                )
+
+    def iter_file_chunks(
+        self,
+        file_id: str,
+        chunk_size: int = 100,
+        overlap_size: int = 20,
+    ) -> Iterator[Document]:
+        """Chunk a file page by page without loading it whole.
+
+        The last chunk of every page is held back and re-split together with
+        the next page, so chunks (and their overlap) run across page
+        boundaries. A chunk keeps the metadata of the page it starts on.
+        """
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=overlap_size,
+            length_function=len,
+            add_start_index=True,
+        )
+
+        carry_text, carry_metadata = "", None
+        for page in self.iter_file_pages(file_id):
+            text = carry_text + page.page_content
+            chunks = text_splitter.create_documents([text])
+            if not chunks:
+                continue
+
+            start_indexes = []
+            for chunk in chunks:
+                start_index = chunk.metadata.pop("start_index")
+                start_indexes.append(start_index)
+                chunk.metadata = dict(
+                    carry_metadata
+                    if start_index < len(carry_text) and carry_metadata
+                    else page.metadata
+                )
+
+            yield from chunks[:-1]
+            # keep the raw tail, the splitter strips whitespace off chunk text
+            carry_text = text[start_indexes[-1] :]
+            carry_metadata = chunks[-1].metadata
+
+        if carry_text.strip():
+            yield Document(page_content=carry_text.strip(), metadata=carry_metadata)
+
+    def iter_chunk_batches(
+        self,
+        file_id: str,
+        chunk_size: int = 100,
+        overlap_size: int = 20,
+        batch_size: int = 500,
+    ) -> Iterator[list]:
+        batch = []
+        for chunk in self.iter_file_chunks(
+            file_id=file_id, chunk_size=chunk_size, overlap_size=overlap_size
+        ):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def chunk_file_to_queue(
+        project_id: str,
+        asset_id: int,
+        file_id: str,
+        chunk_size: int,
+        overlap_size: int,
+        batch_size: int,
+        queue,
+        abort_event=None,
+    ) -> int:
+        """Process-pool entry point: chunk one file and stream its batches.
+
+        Puts `(CHUNKS, asset_id, batch)` messages on `queue` and always ends
+        with a `DONE` or `ERROR` message for the asset, so a single writer
+        can drain results from many workers as they arrive. Stops early once
+        `abort_event` is set, i.e. when the writer has given up.
+        """
+        chunks_count = 0
+        try:
+            process_controller = ProcessController(project_id=project_id)
+            for chunks_batch in process_controller.iter_chunk_batches(
+                file_id=file_id,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                batch_size=batch_size,
+            ):
+                message = (ChunkBatchEventEnum.CHUNKS.value, asset_id, chunks_batch)
+                if not ProcessController.put_to_queue(queue, message, abort_event):
+                    return chunks_count
+                chunks_count += len(chunks_batch)
+        except Exception as e:
+            message = (ChunkBatchEventEnum.ERROR.value, asset_id, str(e))
+            ProcessController.put_to_queue(queue, message, abort_event)
+            return chunks_count
+        message = (ChunkBatchEventEnum.DONE.value, asset_id, None)
+        ProcessController.put_to_queue(queue, message, abort_event)
+        return chunks_count
+
+    @staticmethod
+    def put_to_queue(queue, message, abort_event=None, timeout: float = 1) -> bool:
+        """Blocks until `message` is queued; returns False without queueing
+        it once `abort_event` is set."""
+        if abort_event is None:
+            queue.put(message)
+            return True
+        while not abort_event.is_set():
+            try:
+                queue.put(message, timeout=timeout)
+                return True
+            except Full:
+                continue
+        return False
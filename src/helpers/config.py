@@ -1,6 +1,7 @@
 from pickle import NONE
 from tkinter import N
-from typing import List
+from typing import Dict, List, Optional
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,6 +16,14 @@ class Settings(BaseSettings):
     ALLOWED_FILE_TYPES: List[str]
     ALLOWED_MAX_FILE_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
+    FILE_PROCESSING_BATCH_SIZE: int = 500
+    FILE_PROCESSING_WORKERS: int = 1
+    CHUNK_READ_PAGE_SIZE: int = 500
+    CHUNK_INSERT_BATCH_SIZE: int = 1000
+    INDEXING_SHARD_SIZE: int = 2000
+    INDEXING_EMBED_CONCURRENCY: int = 2
+    INDEXING_UPSERT_CONCURRENCY: int = 1
+    INDEXING_PIPELINE_QUEUE_SIZE: int = 2
     MONGO_URI: str
     MONGO_DB_NAME: str
     MONGO_INITDB_ROOT_USERNAME: str  # Add this field
@@ -41,20 +50,98 @@ class Settings(BaseSettings):
     INPUT_DEFAULT_MAX_CHARS: int = None
     GENERATION_DEFAULT_MAX_TOKENS: int = None
     GENERATION_DEFAULT_TEMPERATURE: float = None
+    RAG_CONTEXT_MAX_TOKENS: int = 4000
+    RAG_CONTEXT_DEDUPE_THRESHOLD: float = 0.8
+    RAG_TOKENIZER_ENCODING: str = "cl100k_base"
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_SEARCH_CANDIDATES: int = 30
+    HYBRID_SEARCH_RRF_K: int = 60
+    HYBRID_SEARCH_STOPWORD_CONFIG: str = "english"
+    HYBRID_SEARCH_MAX_TERMS: int = 16
+    RERANK_BACKEND: Optional[str] = None
+    RERANK_MODEL_ID: Optional[str] = None
+    RERANK_CANDIDATES: int = 30
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_MAX_LENGTH: int = 512
+    RERANK_DEVICE: Optional[str] = None
+    BATCH_MAX_QUERIES: int = 500
+    BATCH_ANSWER_CONCURRENCY: int = 8
+    EMBEDDING_BATCH_MAX_ITEMS: int = 96
+    EMBEDDING_BATCH_MAX_CHARS: int = 100000
+    EMBEDDING_BATCH_MAX_RETRIES: int = 3
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_RATE_LIMIT_RPM: Optional[int] = None
+    LLM_RATE_LIMIT_TPM: Optional[int] = None
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+    LLM_RATE_LIMIT_MAX_RETRIES: int = 5
+    LLM_RATE_LIMIT_BACKOFF: float = 1.0
+    LLM_RATE_LIMIT_MAX_BACKOFF: float = 60.0
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ITEMS: int = 20000
+    EMBEDDING_CACHE_PERSISTENT_BACKEND: Optional[str] = None
+    EMBEDDING_CACHE_PATH: str = "embedding_cache"
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ITEMS: int = 5000
+    ANSWER_CACHE_TTL_SECONDS: float = 3600
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
     VECTOR_DB_BACKEND: str
     VECTOR_DB_PATH: str
     VECTOR_DB_DISTANCE_METHOD: str
+    VECTOR_DB_QUANTIZATION: str = "none"
+    VECTOR_DB_QUANTIZATION_QUANTILE: float = 0.99
+    VECTOR_DB_QUANTIZATION_ALWAYS_RAM: bool = True
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING: float = 2.0
+    VECTOR_DB_QUANTIZATION_RESCORE: bool = True
+    VECTOR_DB_QUANTIZATION_CACHE_TTL: float = 300
+    PGVECTOR_INDEX_TYPE: str = "hnsw"
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_HNSW_EF_SEARCH: int = 40
+    PGVECTOR_IVFFLAT_LISTS: int = 100
+    PGVECTOR_IVFFLAT_PROBES: int = 10
+    EMBEDDED_VECTOR_DB_SEGMENT_MAX_ROWS: int = 100000
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
     # Celery Configs
     CELERY_BROKER_URL: str = None
     CELERY_RESULT_BACKEND: str = None
+    REDIS_URL: Optional[str] = None
     CELERY_TASK_SERIALIZER: str = "json"
     CELERY_TASK_TIME_LIMIT: int = 600
     CELERY_TASK_ACKS_LATE: bool = True
     CELERY_WORKER_CONCURRENCY: int = 2
     CELERY_FLOWER_PASSWORD: str
 
+    # ---------- derived values, built once per Settings instance ----------
+
+    @cached_property
+    def postgres_async_dsn(self) -> str:
+        return self.get_postgres_dsn(driver="asyncpg")
+
+    @cached_property
+    def postgres_sync_dsn(self) -> str:
+        return self.get_postgres_dsn(driver="psycopg2")
+
+    @cached_property
+    def shared_redis_url(self) -> Optional[str]:
+        """`REDIS_URL`, or the Celery result backend when that is Redis."""
+        if self.REDIS_URL:
+            return self.REDIS_URL
+        result_backend = self.CELERY_RESULT_BACKEND
+        if result_backend and result_backend.startswith(("redis://", "rediss://")):
+            return result_backend
+        return None
+
+    def get_postgres_dsn(self, driver: str) -> str:
+        return (
+            f"postgresql+{driver}://{self.POSTGRES_USERNAME}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_MAIN_DB}"
+        )
+
     class Config:
         # Get the project root directory (parent of src)
         project_root = Path(__file__).parent.parent.parent
@@ -62,5 +149,12 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
+@lru_cache(maxsize=1)
 def get_settings():
+    # parsed once per process; call `reload_settings()` after changing .env
     return Settings()
+
+
+def reload_settings():
+    get_settings.cache_clear()
+    return get_settings()
@@ -4,9 +4,17 @@ from helpers.config import get_settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
+from stores.llm.ContextPacker import ContextPacker
+from stores.rerank import RerankProviderFactory
+from stores.cache import (
+    AsyncCachedEmbeddingProvider,
+    EmbeddingCacheFactory,
+    AnswerCacheFactory,
+)
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from utils.metrics import setup_metrics
+
 app = FastAPI()
 
 setup_metrics(app)
@@ -15,32 +23,61 @@ setup_metrics(app)
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    postgress_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DB}"
-    app.db_engine = create_async_engine(postgress_conn)
+    app.db_engine = create_async_engine(settings.postgres_async_dsn)
     app.db_client = sessionmaker(
         bind=app.db_engine, expire_on_commit=False, class_=AsyncSession
     )
 
-    llm_provider_factory = LLMProviderFactory(settings)
+    app.llm_provider_factory = LLMProviderFactory(settings)
     vector_db_factory = VectorDBProviderFactory(settings)
-    app.generation_client = llm_provider_factory.create(settings.GENERATION_BACKEND)
+    app.generation_client = app.llm_provider_factory.create_async(
+        settings.GENERATION_BACKEND
+    )
     app.generation_client.set_generation_model(model_id=settings.GENERATION_MOELL_ID)
-    app.embedding_client = llm_provider_factory.create(settings.EMBEDDING_BACKEND)
+    app.embedding_client = app.llm_provider_factory.create_async(
+        settings.EMBEDDING_BACKEND
+    )
     app.embedding_client.set_embedding_model(
         model_id=settings.EMBEDDING_MODEL_ID,
         embedding_size=settings.EMBEDDING_MODEL_SIZE,
     )
-    app.vector_db_client = vector_db_factory.create(proivder=settings.VECTOR_DB_BACKEND)
-    app.vector_db_client.connect()
+    embedding_cache = EmbeddingCacheFactory(settings).create()
+    if embedding_cache:
+        app.embedding_client = AsyncCachedEmbeddingProvider(
+            provider=app.embedding_client,
+            provider_name=settings.EMBEDDING_BACKEND,
+            cache=embedding_cache,
+        )
+    app.answer_cache = AnswerCacheFactory(settings).create()
+    app.reranker = RerankProviderFactory(settings).create(
+        settings.RERANK_BACKEND,
+        http_client=app.llm_provider_factory.get_http_client(),
+        rate_limiter=app.llm_provider_factory.get_rate_limiter(settings.RERANK_BACKEND),
+    )
+    app.vector_db_client = vector_db_factory.create_async(
+        proivder=settings.VECTOR_DB_BACKEND, db_engine=app.db_engine
+    )
+    await app.vector_db_client.connect()
     app.template_parser = TemplateParser(
         language=settings.PRIMARY_LANG, default_language=settings.DEFAULT_LANG
     )
+    # loads the tokenizer once per process instead of once per request
+    app.context_packer = ContextPacker(
+        max_tokens=settings.RAG_CONTEXT_MAX_TOKENS,
+        dedupe_threshold=settings.RAG_CONTEXT_DEDUPE_THRESHOLD,
+        encoding_name=settings.RAG_TOKENIZER_ENCODING,
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await app.vector_db_client.disconnect()
     await app.db_engine.dispose()
-    app.vector_db_client.disconnect()
+    await app.llm_provider_factory.close()
+    if app.answer_cache:
+        await app.answer_cache.close_async()
+    if isinstance(app.embedding_client, AsyncCachedEmbeddingProvider):
+        app.embedding_client.cache.close()
 
 
 app.include_router(base.base_router)
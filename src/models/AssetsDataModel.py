@@ -54,3 +54,13 @@ class AssetsDataModel(BaseDataModel):
                 result = await session.execute(query)
                 asset = result.scalar_one_or_none()
                 return asset
+
+    async def update_asset_config(self, asset_id: int, asset_config: dict) -> Asset:
+        """Merge `asset_config` into the asset's existing config."""
+        async with self.db_client() as session:
+            async with session.begin():
+                asset = await session.get(Asset, asset_id)
+                if asset is None:
+                    return None
+                asset.asset_config = {**(asset.asset_config or {}), **asset_config}
+        return asset
@@ -5,11 +5,14 @@ from attr import dataclass
 from bson import ObjectId
 from numpy import record
 from .BaseDataModel import BaseDataModel
-from .db_schemas import DataChunk
+from .db_schemas import DataChunk, DataChunkTombstone, ReterievedDocument
 from .enums.DataBaseEnum import DataBaseEnum
 from pymongo import InsertOne
 from sqlalchemy.future import select
-from sqlalchemy import func, delete
+from sqlalchemy import func, delete, insert, update, cast, literal, String, true
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+import json
+import uuid
 
 
 class ChunkDataModel(BaseDataModel):
@@ -49,34 +52,312 @@ class ChunkDataModel(BaseDataModel):
             await session.commit()
         return len(chunks)
 
+    async def bulk_insert_chunks(
+        self, chunks: list, batch_size: int = 1000, return_ids: bool = False
+    ):
+        """Inserts chunk rows given as dicts of `DataChunk` column values,
+        bypassing the ORM unit of work.
+
+        On asyncpg the rows are streamed with COPY; when `return_ids` is set
+        a Core multi-row INSERT ... RETURNING is used instead and the new
+        `chunk_id`s are returned in input order. Otherwise returns the count.
+        """
+        rows = [
+            {"chunk_uuid": uuid.uuid4(), "chunk_metadata": None, **chunk}
+            for chunk in chunks
+        ]
+        columns = [
+            "chunk_uuid",
+            "chunk_asset_id",
+            "chunk_project_id",
+            "chunk_text",
+            "chunk_order",
+            "chunk_metadata",
+        ]
+        inserted_ids = []
+        async with self.db_client() as session:
+            async with session.begin():
+                connection = await session.connection()
+                use_copy = not return_ids and connection.dialect.driver == "asyncpg"
+                for i in range(0, len(rows), batch_size):
+                    batch = rows[i : i + batch_size]
+                    if use_copy:
+                        raw_connection = await connection.get_raw_connection()
+                        await raw_connection.driver_connection.copy_records_to_table(
+                            DataChunk.__tablename__,
+                            columns=columns,
+                            records=[
+                                tuple(
+                                    (
+                                        json.dumps(row[column])
+                                        if column == "chunk_metadata"
+                                        and row[column] is not None
+                                        else row[column]
+                                    )
+                                    for column in columns
+                                )
+                                for row in batch
+                            ],
+                        )
+                    elif return_ids:
+                        result = await session.execute(
+                            insert(DataChunk).returning(
+                                DataChunk.chunk_id, sort_by_parameter_order=True
+                            ),
+                            batch,
+                        )
+                        inserted_ids.extend(result.scalars().all())
+                    else:
+                        await session.execute(insert(DataChunk), batch)
+        return inserted_ids if return_ids else len(rows)
+
     async def delete_chunks_by_project_id(self, project_id: int) -> int:
+        return await self.delete_chunks(DataChunk.chunk_project_id == project_id)
+
+    async def delete_chunks_by_asset_id(self, asset_id: int) -> int:
+        return await self.delete_chunks(DataChunk.chunk_asset_id == asset_id)
+
+    async def delete_chunks(self, *conditions) -> int:
+        """Deletes the matching chunks and leaves a tombstone for each in the
+        same statement, so the next indexing run deletes their vectors
+        without diffing the whole collection.
+
+        Unindexed chunks are tombstoned too: an indexing run may be
+        upserting their vectors while they are deleted.
+        """
+        async with self.db_client() as session:
+            async with session.begin():
+                deleted_chunks = (
+                    delete(DataChunk)
+                    .where(*conditions)
+                    .returning(DataChunk.chunk_id, DataChunk.chunk_project_id)
+                    .cte("deleted_chunks")
+                )
+                tombstone_query = insert(DataChunkTombstone).from_select(
+                    ["tombstone_chunk_id", "tombstone_project_id"],
+                    select(
+                        deleted_chunks.c.chunk_id, deleted_chunks.c.chunk_project_id
+                    ),
+                )
+                result = await session.execute(tombstone_query)
+            await session.commit()
+        return result.rowcount
+
+    async def get_chunk_tombstone_ids(self, project_id: int, limit: int = 500) -> list:
         async with self.db_client() as session:
             async with session.begin():
-                delete_query = delete(DataChunk).where(
-                    DataChunk.chunk_project_id == project_id
+                query = (
+                    select(DataChunkTombstone.tombstone_chunk_id)
+                    .where(DataChunkTombstone.tombstone_project_id == project_id)
+                    .order_by(DataChunkTombstone.tombstone_chunk_id)
+                    .limit(limit)
+                )
+                result = await session.execute(query)
+                return list(result.scalars().all())
+
+    async def delete_chunk_tombstones(self, chunk_ids: list) -> int:
+        async with self.db_client() as session:
+            async with session.begin():
+                delete_query = delete(DataChunkTombstone).where(
+                    DataChunkTombstone.tombstone_chunk_id.in_(chunk_ids)
                 )
                 result = await session.execute(delete_query)
             await session.commit()
         return result.rowcount
 
-    async def get_project_chunks(
-        self, project_id: int, page_no: int = 1, page_size: int = 50
+    async def mark_chunks_indexed(self, chunk_ids: list) -> int:
+        async with self.db_client() as session:
+            async with session.begin():
+                update_query = (
+                    update(DataChunk)
+                    .where(DataChunk.chunk_id.in_(chunk_ids))
+                    .values(chunk_is_indexed=True)
+                )
+                result = await session.execute(update_query)
+            await session.commit()
+        return result.rowcount
+
+    async def reset_project_index_state(self, project_id: int) -> int:
+        """Marks every chunk of the project unindexed and drops its
+        tombstones; for when the project's collection has been emptied."""
+        async with self.db_client() as session:
+            async with session.begin():
+                update_query = (
+                    update(DataChunk)
+                    .where(
+                        DataChunk.chunk_project_id == project_id,
+                        DataChunk.chunk_is_indexed,
+                    )
+                    .values(chunk_is_indexed=False)
+                )
+                result = await session.execute(update_query)
+                await session.execute(
+                    delete(DataChunkTombstone).where(
+                        DataChunkTombstone.tombstone_project_id == project_id
+                    )
+                )
+            await session.commit()
+        return result.rowcount
+
+    async def get_project_chunk_ids(
+        self, project_id: int, unindexed_only: bool = False
+    ) -> list:
+        async with self.db_client() as session:
+            async with session.begin():
+                query = (
+                    select(DataChunk.chunk_id)
+                    .where(DataChunk.chunk_project_id == project_id)
+                    .order_by(DataChunk.chunk_id)
+                )
+                if unindexed_only:
+                    query = query.where(~DataChunk.chunk_is_indexed)
+                result = await session.execute(query)
+                return list(result.scalars().all())
+
+    async def get_chunks_by_ids(self, chunk_ids: list) -> list:
+        async with self.db_client() as session:
+            async with session.begin():
+                query = (
+                    select(DataChunk)
+                    .where(DataChunk.chunk_id.in_(chunk_ids))
+                    .order_by(DataChunk.chunk_id)
+                )
+                result = await session.execute(query)
+                return result.scalars().all()
+
+    def get_any_word_tsquery(
+        self, text_expression, stopword_config: str = "english", max_terms: int = 16
     ):
+        # to_tsquery('simple', 'word1' | 'word2' | ...) over the lexemes of
+        # the text; quoting keeps punctuation in lexemes from being parsed.
+        # Stopwords (lexemes `stopword_config` drops) would match nearly every
+        # chunk, so they are left out, and only the `max_terms` longest
+        # words are kept
+        lexemes = func.unnest(func.to_tsvector("simple", text_expression)).table_valued(
+            "lexeme", "positions", "weights"
+        )
+        terms = func.array_agg(
+            aggregate_order_by(
+                func.quote_literal(lexemes.c.lexeme),
+                func.length(lexemes.c.lexeme).desc(),
+            )
+        )
+        return func.to_tsquery(
+            "simple",
+            select(func.array_to_string(terms[1:max_terms], " | "))
+            .select_from(lexemes)
+            .where(func.length(func.to_tsvector(stopword_config, lexemes.c.lexeme)) > 0)
+            .scalar_subquery(),
+        )
+
+    async def search_project_chunks(
+        self,
+        project_id: int,
+        text: str,
+        limit: int = 10,
+        stopword_config: str = "english",
+        max_terms: int = 16,
+    ) -> list:
+        """Full-text search over the project's chunks, best match first.
+
+        Chunks matching any non-stopword of `text` are candidates and
+        `ts_rank_cd` ranks those matching more of them, closer together,
+        first; requiring every word would miss most natural-language
+        questions. Candidates come from the GIN index on `chunk_text_tsv`.
+        """
+        query_tsv = self.get_any_word_tsquery(
+            literal(text, String), stopword_config=stopword_config, max_terms=max_terms
+        )
+        rank = func.ts_rank_cd(DataChunk.chunk_text_tsv, query_tsv)
         async with self.db_client() as session:
             async with session.begin():
-                total_chunks_query = select(func.count(DataChunk.chunk_id)).where(
-                    DataChunk.chunk_project_id == project_id
+                search_query = (
+                    select(DataChunk.chunk_id, DataChunk.chunk_text, rank.label("rank"))
+                    .where(
+                        DataChunk.chunk_project_id == project_id,
+                        DataChunk.chunk_text_tsv.op("@@")(query_tsv),
+                    )
+                    .order_by(rank.desc(), DataChunk.chunk_id)
+                    .limit(limit)
                 )
-                total_chunks_result = await session.execute(total_chunks_query)
-                total_chunks = total_chunks_result.scalar_one()
+                result = await session.execute(search_query)
+                rows = result.all()
+        return [
+            ReterievedDocument(
+                **{"score": row.rank, "text": row.chunk_text, "chunk_id": row.chunk_id}
+            )
+            for row in rows
+        ]
 
-                total_pages = total_chunks // page_size
-                if total_chunks % page_size != 0:
-                    total_pages += 1
+    async def search_project_chunks_batch(
+        self,
+        project_id: int,
+        texts: list,
+        limit: int = 10,
+        stopword_config: str = "english",
+        max_terms: int = 16,
+    ) -> list:
+        """`search_project_chunks` for many queries in one statement (a
+        LATERAL join over the unnested query texts). Returns one result list
+        per text, in input order."""
+        queries = (
+            func.unnest(cast(texts, ARRAY(String)))
+            .table_valued("query_text", with_ordinality="query_no")
+            .render_derived(name="queries")
+        )
+        query_tsv = self.get_any_word_tsquery(
+            queries.c.query_text, stopword_config=stopword_config, max_terms=max_terms
+        )
+        rank = func.ts_rank_cd(DataChunk.chunk_text_tsv, query_tsv)
+        hits = (
+            select(DataChunk.chunk_id, DataChunk.chunk_text, rank.label("rank"))
+            .where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_text_tsv.op("@@")(query_tsv),
+            )
+            .order_by(rank.desc(), DataChunk.chunk_id)
+            .limit(limit)
+            .lateral("hits")
+        )
+        async with self.db_client() as session:
+            async with session.begin():
+                search_query = (
+                    select(
+                        queries.c.query_no,
+                        hits.c.chunk_id,
+                        hits.c.chunk_text,
+                        hits.c.rank,
+                    )
+                    .select_from(queries)
+                    .join(hits, true())
+                    .order_by(queries.c.query_no, hits.c.rank.desc())
+                )
+                result = await session.execute(search_query)
+                rows = result.all()
 
+        batch_results = [[] for _ in texts]
+        for row in rows:
+            # ORDINALITY is 1-based
+            batch_results[row.query_no - 1].append(
+                ReterievedDocument(
+                    **{
+                        "score": row.rank,
+                        "text": row.chunk_text,
+                        "chunk_id": row.chunk_id,
+                    }
+                )
+            )
+        return batch_results
+
+    async def get_project_chunks(
+        self, project_id: int, page_no: int = 1, page_size: int = 50
+    ):
+        async with self.db_client() as session:
+            async with session.begin():
                 chunks_query = (
                     select(DataChunk)
                     .where(DataChunk.chunk_project_id == project_id)
+                    .order_by(DataChunk.chunk_id)
                     .offset((page_no - 1) * page_size)
                     .limit(page_size)
                 )
@@ -84,3 +365,39 @@ class ChunkDataModel(BaseDataModel):
                 chunks = chunks_result.scalars().all()
 
         return chunks
+
+    async def iter_project_chunks(
+        self,
+        project_id: int,
+        page_size: int = 500,
+        after_chunk_id: int = 0,
+        unindexed_only: bool = False,
+    ):
+        """Yields the project's chunks page by page in `chunk_id` order.
+
+        Each page starts after the last id of the previous one, so reading
+        page N costs the same as reading the first. With `unindexed_only`,
+        only chunks not yet marked indexed are read, from a partial index.
+        """
+        while True:
+            async with self.db_client() as session:
+                async with session.begin():
+                    chunks_query = (
+                        select(DataChunk)
+                        .where(
+                            DataChunk.chunk_project_id == project_id,
+                            DataChunk.chunk_id > after_chunk_id,
+                        )
+                        .order_by(DataChunk.chunk_id)
+                        .limit(page_size)
+                    )
+                    if unindexed_only:
+                        chunks_query = chunks_query.where(~DataChunk.chunk_is_indexed)
+                    chunks_result = await session.execute(chunks_query)
+                    chunks = chunks_result.scalars().all()
+            if not chunks:
+                return
+            yield chunks
+            if len(chunks) < page_size:
+                return
+            after_chunk_id = chunks[-1].chunk_id
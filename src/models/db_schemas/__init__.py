@@ -4,4 +4,5 @@
 
 from .rag.schemas import Project
 from .rag.schemas import DataChunk, ReterievedDocument
+from .rag.schemas import DataChunkTombstone
 from .rag.schemas import Asset
@@ -2,3 +2,4 @@ from .rag_base import SQLAlchemyBase
 from .project import Project
 from .asset import Asset
 from .data_chunk import DataChunk, ReterievedDocument
+from .data_chunk_tombstone import DataChunkTombstone
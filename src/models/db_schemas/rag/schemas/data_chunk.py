@@ -1,10 +1,22 @@
 from openai import project
 from .rag_base import SQLAlchemyBase
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Index
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    Integer,
+    String,
+    DateTime,
+    func,
+    ForeignKey,
+    Index,
+    false,
+)
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import uuid
 from pydantic import BaseModel
+from typing import Optional
 
 class DataChunk(SQLAlchemyBase):
     __tablename__ = "data_chunks"
@@ -20,6 +32,21 @@ class DataChunk(SQLAlchemyBase):
     chunk_text = Column(String, nullable=False)
     chunk_order = Column(Integer, nullable=False)
     chunk_metadata = Column(JSONB, nullable=True)
+    # lexical index over the chunk text, kept up to date by Postgres; the
+    # 'simple' config does no stemming, so codes and part numbers match as-is.
+    # Deferred: only the search query needs it, not chunk reads
+    chunk_text_tsv = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('simple', chunk_text)", persisted=True),
+            nullable=True,
+        )
+    )
+    # set once the chunk's vector is upserted, so incremental indexing only
+    # reads the chunks still to embed
+    chunk_is_indexed = Column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -36,8 +63,18 @@ class DataChunk(SQLAlchemyBase):
     __table_args__ = (
         Index("ix_data_chunk_asset_id", chunk_asset_id),
         Index("ix_data_chunk_project_id", chunk_project_id),
+        Index("ix_data_chunk_text_tsv", chunk_text_tsv, postgresql_using="gin"),
+        Index(
+            "ix_data_chunk_unindexed",
+            chunk_project_id,
+            chunk_id,
+            postgresql_where=~chunk_is_indexed,
+        ),
     )
 class ReterievedDocument(BaseModel):
     text : str 
     score : float 
+    chunk_id : Optional[int] = None
+    # vector similarity when `score` holds a fused hybrid-search score
+    dense_score : Optional[float] = None
 
@@ -0,0 +1,23 @@
+from .rag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, DateTime, func, ForeignKey, Index
+
+
+class DataChunkTombstone(SQLAlchemyBase):
+    """The id of a deleted chunk whose vector may still be in the project's
+    collection; removed once the next indexing run has deleted the vector."""
+
+    __tablename__ = "data_chunk_tombstones"
+
+    tombstone_chunk_id = Column(Integer, primary_key=True, autoincrement=False)
+    tombstone_project_id = Column(
+        Integer, ForeignKey("projects.project_id"), nullable=False
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_data_chunk_tombstone_project_id", tombstone_project_id),
+    )
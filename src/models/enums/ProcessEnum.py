@@ -1,4 +1,12 @@
 from enum import Enum
+
+
 class ProcessEnum(Enum):
     PDF = ".pdf"
-    TXT = ".txt"
\ No newline at end of file
+    TXT = ".txt"
+
+
+class ChunkBatchEventEnum(Enum):
+    CHUNKS = "chunks"
+    DONE = "done"
+    ERROR = "error"
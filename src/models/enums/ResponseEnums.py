@@ -17,6 +17,7 @@ class ResponseSignal(Enum):
     VECTOR_DB_COLLECTION_RETRIEVED = "Vector database collection retrieved"
     VECTOR_DB_SEARCH_ERROR = "SEARCH ERROR"
     VECTOR_DB_SEARCH_SUCCESS = "SEARCH successfulL"
+    BATCH_SIZE_INVALID = "invalid batch size"
     RAG_ANSWER_ERROR = "rag answer error"
     RAG_ANSWER_SUCCESS = "rag answer success"
     DATA_PUSH_TASK_READY = "data push task is ready"
@@ -1,21 +1,22 @@
 from gettext import dpgettext
 from re import template
 from fastapi import FastAPI, APIRouter, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from httpx import request
 from openai import project
-from routers.schemas.nlp import PushRequest, SearcRequest
+from routers.schemas.nlp import PushRequest, SearcRequest, BatchSearchRequest
 from models.PorjectDataModel import ProjectDataModel
 from models.ChunkDataModel import ChunkDataModel
 from controllers import NLPController
 from models import ResponseSignal
+from helpers.config import get_settings
+import json
 import logging
-from tasks.data_indexing import index_data_content
+from tasks.data_indexing import index_data_content, index_data_content_sharded
 
 from stores.llm.templates import template_parser
 
-
-logging.getLogger("uvicorn.error")
+logger = logging.getLogger("uvicorn.error")
 
 nlp_router = APIRouter(
     prefix="/api/v1/nlp",
@@ -25,9 +26,11 @@ nlp_router = APIRouter(
 
 @nlp_router.post("/index/push/{project_id}")
 async def index_project(request: Request, project_id: int, push_request: PushRequest):
-    task = index_data_content.delay(
-        project_id=project_id, do_reset=push_request.do_reset
+    # fan_out splits the project into sub-tasks across the data_indexing workers
+    index_task = (
+        index_data_content_sharded if push_request.fan_out else index_data_content
     )
+    task = index_task.delay(project_id=project_id, do_reset=push_request.do_reset)
     # project_data_model = await ProjectDataModel.create_instance(
     #     db_client=request.app.db_client
     # )
@@ -96,8 +99,12 @@ async def get_project_index_info(request: Request, project_id: int):
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+    )
+    collection_info = await nlp_controller.vector_db_collection_info_async(
+        project=project
     )
-    collection_info = nlp_controller.vector_db_collection_info(project=project)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -113,14 +120,18 @@ async def search_index(request: Request, project_id: int, search_request: SearcR
         db_client=request.app.db_client
     )
     project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    chunk_model = await ChunkDataModel.create_instance(db_client=request.app.db_client)
     nlp_controller = NLPController(
         vector_db_client=request.app.vector_db_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+        chunk_model=chunk_model,
     )
 
-    results = nlp_controller.search_db_collection(
+    results = await nlp_controller.search_db_collection_async(
         project=project, text=search_request.text, limit=search_request.limit
     )
 
@@ -146,15 +157,21 @@ async def answer_rag(request: Request, project_id: int, search_request: SearcReq
         db_client=request.app.db_client
     )
     project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    chunk_model = await ChunkDataModel.create_instance(db_client=request.app.db_client)
     nlp_controller = NLPController(
         vector_db_client=request.app.vector_db_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+        chunk_model=chunk_model,
+        reranker=request.app.reranker,
     )
-    answer, full_prompt, chat_history = nlp_controller.answer_rag_questions(
+    rag_result = await nlp_controller.answer_rag_questions_async(
         project=project, query=search_request.text, limit=search_request.limit
     )
+    answer, full_prompt, chat_history = rag_result or (None, None, None)
 
     if not answer:
         return JSONResponse(
@@ -171,3 +188,157 @@ async def answer_rag(request: Request, project_id: int, search_request: SearcReq
             "chat_history": chat_history,
         },
     )
+
+
+def is_valid_batch(batch_request: BatchSearchRequest) -> bool:
+    return 0 < len(batch_request.texts) <= get_settings().BATCH_MAX_QUERIES
+
+
+@nlp_router.post("/index/search/batch/{project_id}")
+async def search_index_batch(
+    request: Request, project_id: int, batch_request: BatchSearchRequest
+):
+    if not is_valid_batch(batch_request):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": ResponseSignal.BATCH_SIZE_INVALID.value},
+        )
+    project_data_model = await ProjectDataModel.create_instance(
+        db_client=request.app.db_client
+    )
+    project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    chunk_model = await ChunkDataModel.create_instance(db_client=request.app.db_client)
+    nlp_controller = NLPController(
+        vector_db_client=request.app.vector_db_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+        chunk_model=chunk_model,
+    )
+
+    batch_results = await nlp_controller.search_db_collection_batch_async(
+        project=project, texts=batch_request.texts, limit=batch_request.limit
+    )
+
+    # one list per query, in request order; empty when the query failed
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "message": ResponseSignal.VECTOR_DB_SEARCH_SUCCESS.value,
+            "results": [
+                [result.dict() for result in results] for results in batch_results
+            ],
+        },
+    )
+
+
+@nlp_router.post("/index/answer/batch/{project_id}")
+async def answer_rag_batch(
+    request: Request, project_id: int, batch_request: BatchSearchRequest
+):
+    if not is_valid_batch(batch_request):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": ResponseSignal.BATCH_SIZE_INVALID.value},
+        )
+    project_data_model = await ProjectDataModel.create_instance(
+        db_client=request.app.db_client
+    )
+    project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    chunk_model = await ChunkDataModel.create_instance(db_client=request.app.db_client)
+    nlp_controller = NLPController(
+        vector_db_client=request.app.vector_db_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+        chunk_model=chunk_model,
+        reranker=request.app.reranker,
+    )
+    rag_results = await nlp_controller.answer_rag_questions_batch_async(
+        project=project, queries=batch_request.texts, limit=batch_request.limit
+    )
+
+    # null for a query that could not be answered
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "message": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+            "answers": [
+                (
+                    dict(zip(("answer", "full_prompt", "chat_history"), rag_result))
+                    if rag_result
+                    else None
+                )
+                for rag_result in rag_results
+            ],
+        },
+    )
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@nlp_router.post("/index/answer/stream/{project_id}")
+async def answer_rag_stream(
+    request: Request, project_id: int, search_request: SearcRequest
+):
+    project_data_model = await ProjectDataModel.create_instance(
+        db_client=request.app.db_client
+    )
+    project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    chunk_model = await ChunkDataModel.create_instance(db_client=request.app.db_client)
+    nlp_controller = NLPController(
+        vector_db_client=request.app.vector_db_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        answer_cache=request.app.answer_cache,
+        context_packer=request.app.context_packer,
+        chunk_model=chunk_model,
+        reranker=request.app.reranker,
+    )
+    rag_stream = await nlp_controller.answer_rag_questions_stream_async(
+        project=project, query=search_request.text, limit=search_request.limit
+    )
+
+    if not rag_stream:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": ResponseSignal.RAG_ANSWER_ERROR.value},
+        )
+    retrieved_documents, token_stream, full_prompt, chat_history = rag_stream
+
+    async def event_stream():
+        yield format_sse(
+            "documents",
+            {"documents": [document.dict() for document in retrieved_documents]},
+        )
+        try:
+            async for token in token_stream:
+                yield format_sse("token", {"text": token})
+        except Exception as e:
+            logger.error(f"Error while streaming RAG answer: {e}")
+            yield format_sse(
+                "error", {"message": ResponseSignal.RAG_ANSWER_ERROR.value}
+            )
+            return
+        yield format_sse(
+            "done",
+            {
+                "message": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+                "full_prompt": full_prompt,
+                "chat_history": chat_history,
+            },
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # stop proxies from buffering the stream before it reaches the client
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
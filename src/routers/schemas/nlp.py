@@ -1,11 +1,17 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
+    fan_out: Optional[int] = 0
 
 
 class SearcRequest(BaseModel):
     text: str
     limit: Optional[int] = 5
+
+
+class BatchSearchRequest(BaseModel):
+    texts: List[str]
+    limit: Optional[int] = 5
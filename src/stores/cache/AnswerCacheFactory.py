@@ -0,0 +1,33 @@
+from .CollectionVersionStore import CollectionVersionStore
+from .SemanticAnswerCache import SemanticAnswerCache
+import logging
+
+
+class AnswerCacheFactory:
+
+    def __init__(self, config):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+    def create(self):
+        if not self.config.ANSWER_CACHE_ENABLED:
+            return None
+
+        version_store = self.create_version_store()
+        if version_store is None:
+            # without a shared version there is no way to invalidate on re-index
+            self.logger.warning("Answer cache disabled: no Redis URL configured.")
+            return None
+
+        return SemanticAnswerCache(
+            version_store=version_store,
+            max_items=self.config.ANSWER_CACHE_MAX_ITEMS,
+            ttl_seconds=self.config.ANSWER_CACHE_TTL_SECONDS,
+            similarity_threshold=self.config.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        )
+
+    def create_version_store(self):
+        redis_url = self.config.shared_redis_url
+        if not redis_url:
+            return None
+        return CollectionVersionStore(redis_url=redis_url)
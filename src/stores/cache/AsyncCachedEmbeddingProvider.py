@@ -0,0 +1,65 @@
+from stores.llm.AsyncLLMInterface import AsyncLLMInterface
+from .CachedEmbeddingProvider import CachedEmbeddingProvider
+from .EmbeddingCache import EmbeddingCache
+
+
+class AsyncCachedEmbeddingProvider(CachedEmbeddingProvider, AsyncLLMInterface):
+    """Async counterpart of `CachedEmbeddingProvider` for `AsyncLLMInterface`
+    providers. The in-memory tier is used inline; persistent-tier reads and
+    writes run in a worker thread so SQLite I/O never blocks the event loop.
+    """
+
+    def __init__(
+        self, provider: AsyncLLMInterface, provider_name: str, cache: EmbeddingCache
+    ):
+        super().__init__(provider=provider, provider_name=provider_name, cache=cache)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> str:
+        return await self.provider.generate_text(
+            prompt=prompt,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            chat_history=chat_history,
+        )
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ):
+        return self.provider.generate_text_stream(
+            prompt=prompt,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            chat_history=chat_history,
+        )
+
+    async def embed_text(self, text: str, document_type: str = None) -> list[float]:
+        vectors = await self.embed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+        return vectors[0]
+
+    async def embed_texts(self, texts: list, document_type: str = None) -> list:
+        keys = self.make_keys(texts=texts, document_type=document_type)
+        cached = await self.cache.get_many_async(keys)
+        missing = self.get_missing(keys=keys, texts=texts, cached=cached)
+        if missing:
+            vectors = await self.provider.embed_texts(
+                texts=list(missing.values()), document_type=document_type
+            )
+            if vectors is None:
+                return None
+            new_items = self.get_new_items(missing=missing, vectors=vectors)
+            await self.cache.set_many_async(new_items)
+            cached.update(new_items)
+
+        return self.to_vectors(keys=keys, cached=cached)
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class EmbeddingCacheBackendEnums(Enum):
+
+    DISK = "disk"
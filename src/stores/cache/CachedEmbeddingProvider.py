@@ -0,0 +1,121 @@
+from stores.llm.LLMInterface import LLMInterface
+from .EmbeddingCache import EmbeddingCache
+import numpy as np
+
+
+class CachedEmbeddingProvider(LLMInterface):
+    """Wraps an `LLMInterface` provider and serves embeddings from a cache.
+
+    Generation calls and any other attribute access go straight to the
+    wrapped provider.
+    """
+
+    def __init__(
+        self, provider: LLMInterface, provider_name: str, cache: EmbeddingCache
+    ):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        return self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int = None):
+        return self.provider.set_embedding_model(
+            model_id=model_id, embedding_size=embedding_size
+        )
+
+    def generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        chat_history: list = [],
+        temperature: float = None,
+    ) -> str:
+        return self.provider.generate_text(
+            prompt=prompt,
+            max_output_tokens=max_output_tokens,
+            chat_history=chat_history,
+            temperature=temperature,
+        )
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        chat_history: list = None,
+        temperature: float = None,
+    ):
+        return self.provider.generate_text_stream(
+            prompt=prompt,
+            max_output_tokens=max_output_tokens,
+            chat_history=chat_history,
+            temperature=temperature,
+        )
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    def embed_text(self, text: str, document_type: str = None) -> list[float]:
+        vectors = self.embed_texts(texts=[text], document_type=document_type)
+        if not vectors:
+            return None
+        return vectors[0]
+
+    def embed_texts(self, texts: list, document_type: str = None) -> list:
+        keys, cached, missing = self.lookup(texts=texts, document_type=document_type)
+        if missing:
+            vectors = self.provider.embed_texts(
+                texts=list(missing.values()), document_type=document_type
+            )
+            if vectors is None:
+                return None
+            self.store(cached=cached, missing=missing, vectors=vectors)
+
+        return self.to_vectors(keys=keys, cached=cached)
+
+    def to_vectors(self, keys: list, cached: dict) -> list:
+        # cache hits are float32 arrays; providers return lists of floats
+        return [
+            vector.tolist() if isinstance(vector, np.ndarray) else vector
+            for vector in (cached.get(key) for key in keys)
+        ]
+
+    def lookup(self, texts: list, document_type: str = None):
+        keys = self.make_keys(texts=texts, document_type=document_type)
+        cached = self.cache.get_many(keys)
+        return keys, cached, self.get_missing(keys=keys, texts=texts, cached=cached)
+
+    def make_keys(self, texts: list, document_type: str = None) -> list:
+        return [
+            self.cache.make_key(
+                provider=self.provider_name,
+                model_id=self.provider.embedding_model_id,
+                document_type=document_type,
+                text=text,
+            )
+            for text in texts
+        ]
+
+    def get_missing(self, keys: list, texts: list, cached: dict) -> dict:
+        # embed each distinct missing text once, keeping first-seen order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        return missing
+
+    def store(self, cached: dict, missing: dict, vectors: list):
+        new_items = self.get_new_items(missing=missing, vectors=vectors)
+        self.cache.set_many(new_items)
+        cached.update(new_items)
+
+    def get_new_items(self, missing: dict, vectors: list) -> dict:
+        return {
+            key: vector
+            for key, vector in zip(missing.keys(), vectors)
+            if vector is not None
+        }
@@ -0,0 +1,56 @@
+import logging
+import redis
+import redis.asyncio as aioredis
+
+
+class CollectionVersionStore:
+    """Per-collection version counters kept in Redis.
+
+    Celery workers bump a collection's version after rewriting it and the
+    API reads it to scope cached answers, so both sides must see the same
+    store. Errors return None so callers can skip caching instead of serving
+    answers for a collection that may have changed.
+    """
+
+    def __init__(self, redis_url: str, key_prefix: str = "collection_version:"):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.client = None
+        self.async_client = None
+        self.logger = logging.getLogger(__name__)
+
+    def get_key(self, collection_name: str) -> str:
+        return f"{self.key_prefix}{collection_name}"
+
+    def bump(self, collection_name: str) -> int:
+        try:
+            if self.client is None:
+                self.client = redis.Redis.from_url(self.redis_url)
+            return self.client.incr(self.get_key(collection_name))
+        except Exception as e:
+            self.logger.error(
+                f"Error bumping version of collection {collection_name}: {e}"
+            )
+            return None
+
+    async def get_async(self, collection_name: str) -> int:
+        try:
+            if self.async_client is None:
+                self.async_client = aioredis.Redis.from_url(self.redis_url)
+            version = await self.async_client.get(self.get_key(collection_name))
+            return int(version) if version is not None else 0
+        except Exception as e:
+            self.logger.error(
+                f"Error reading version of collection {collection_name}: {e}"
+            )
+            return None
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
@@ -0,0 +1,72 @@
+from threading import Lock
+import logging
+import numpy as np
+import os
+import sqlite3
+
+
+class DiskEmbeddingStore:
+    """Persistent embedding tier backed by a local SQLite file.
+
+    Vectors are stored as packed float32 blobs. WAL mode lets several worker
+    processes share one file.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.join(db_path, "embeddings.sqlite3")
+        self.lock = Lock()
+        self.logger = logging.getLogger(__name__)
+        self.connection = sqlite3.connect(
+            self.db_path, check_same_thread=False, timeout=30
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(cache_key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        if not keys:
+            return found
+        # stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            try:
+                with self.lock:
+                    rows = self.connection.execute(
+                        "SELECT cache_key, vector FROM embeddings "
+                        f"WHERE cache_key IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error reading embedding cache: {e}")
+                continue
+            for cache_key, blob in rows:
+                found[cache_key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def set_many(self, items: dict):
+        if not items:
+            return
+        rows = [
+            (cache_key, np.asarray(vector, dtype=np.float32).tobytes())
+            for cache_key, vector in items.items()
+        ]
+        try:
+            with self.lock:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (cache_key, vector) "
+                    "VALUES (?, ?)",
+                    rows,
+                )
+                self.connection.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error writing embedding cache: {e}")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,111 @@
+from .LRUCache import LRUCache
+from utils.metrics import EMBEDDING_CACHE_REQUESTS
+import asyncio
+import hashlib
+import numpy as np
+import unicodedata
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache.
+
+    Lookups go to the in-process LRU tier first and then to the optional
+    persistent tier; persistent hits are promoted into memory. Vectors are
+    held as float32 arrays (~6 KB per 1536-dim vector); callers convert to
+    lists where a provider's return type is expected.
+    """
+
+    def __init__(self, max_items: int = 50000, persistent_store=None):
+        self.memory = LRUCache(max_items=max_items)
+        self.persistent_store = persistent_store
+        self.hits = {"memory": 0, "persistent": 0}
+        self.misses = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(
+        self, provider: str, model_id: str, document_type: str, text: str
+    ) -> str:
+        text_hash = hashlib.sha256(
+            self.normalize_text(text).encode("utf-8")
+        ).hexdigest()
+        return f"{provider}:{model_id}:{document_type}:{text_hash}"
+
+    def get_many(self, keys: list) -> dict:
+        found, missing = self.get_many_from_memory(keys)
+        if missing and self.persistent_store is not None:
+            found.update(self.get_many_from_persistent(missing))
+        self._count(None, "miss", len(keys) - len(found))
+        return found
+
+    async def get_many_async(self, keys: list) -> dict:
+        """`get_many` for the event loop: the memory tier is read inline,
+        the persistent tier (SQLite I/O) in a worker thread."""
+        found, missing = self.get_many_from_memory(keys)
+        if missing and self.persistent_store is not None:
+            found.update(
+                await asyncio.to_thread(self.get_many_from_persistent, missing)
+            )
+        self._count(None, "miss", len(keys) - len(found))
+        return found
+
+    def get_many_from_memory(self, keys: list):
+        found = {}
+        missing = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+        self._count("memory", "hit", len(found))
+        return found, missing
+
+    def get_many_from_persistent(self, keys: list) -> dict:
+        stored = self.persistent_store.get_many(keys)
+        for key, vector in stored.items():
+            self.memory.set(key, vector)
+        self._count("persistent", "hit", len(stored))
+        return stored
+
+    def set_many(self, items: dict):
+        items = self.set_many_in_memory(items)
+        if self.persistent_store is not None:
+            self.persistent_store.set_many(items)
+
+    async def set_many_async(self, items: dict):
+        items = self.set_many_in_memory(items)
+        if self.persistent_store is not None:
+            await asyncio.to_thread(self.persistent_store.set_many, items)
+
+    def set_many_in_memory(self, items: dict) -> dict:
+        items = {
+            key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()
+        }
+        for key, vector in items.items():
+            self.memory.set(key, vector)
+        return items
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.hits["memory"],
+            "persistent_hits": self.hits["persistent"],
+            "misses": self.misses,
+            "memory_items": len(self.memory),
+        }
+
+    def close(self):
+        if self.persistent_store is not None:
+            self.persistent_store.close()
+
+    def _count(self, tier: str, result: str, count: int):
+        if count <= 0:
+            return
+        if result == "hit":
+            self.hits[tier] += count
+        else:
+            self.misses += count
+            tier = "all"
+        EMBEDDING_CACHE_REQUESTS.labels(tier=tier, result=result).inc(count)
@@ -0,0 +1,31 @@
+from .CacheEnums import EmbeddingCacheBackendEnums
+from .DiskEmbeddingStore import DiskEmbeddingStore
+from .EmbeddingCache import EmbeddingCache
+from controllers.BaseController import BaseController
+
+
+class EmbeddingCacheFactory:
+
+    def __init__(self, config):
+        self.config = config
+        self.base_controller = BaseController()
+
+    def create(self):
+        if not self.config.EMBEDDING_CACHE_ENABLED:
+            return None
+
+        persistent_store = None
+        if (
+            self.config.EMBEDDING_CACHE_PERSISTENT_BACKEND
+            == EmbeddingCacheBackendEnums.DISK.value
+        ):
+            persistent_store = DiskEmbeddingStore(
+                db_path=self.base_controller.get_database_path(
+                    db_name=self.config.EMBEDDING_CACHE_PATH
+                )
+            )
+
+        return EmbeddingCache(
+            max_items=self.config.EMBEDDING_CACHE_MAX_ITEMS,
+            persistent_store=persistent_store,
+        )
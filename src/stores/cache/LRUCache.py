@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used map.
+
+    With `ttl_seconds` set, entries also expire that long after they were
+    written; expired entries are dropped lazily when read.
+
+    `on_evict`, when given, is called with the key of every entry dropped by
+    eviction or expiry (not by `delete` or `clear`), outside the cache lock.
+    """
+
+    def __init__(
+        self, max_items: int = 10000, ttl_seconds: float = None, on_evict=None
+    ):
+        self.max_items = max(1, max_items)
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self.items = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            known = key in self.items
+            live = known and self._is_live(key)
+            if live:
+                self.items.move_to_end(key)
+                value = self.items[key][0]
+        if known and not live:
+            self._evicted([key])
+        return value if live else default
+
+    def peek(self, key, default=None):
+        # like `get`, but leaves the recency order untouched
+        with self.lock:
+            known = key in self.items
+            live = known and self._is_live(key)
+            if live:
+                value = self.items[key][0]
+        if known and not live:
+            self._evicted([key])
+        return value if live else default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        evicted_keys = []
+        with self.lock:
+            self.items[key] = (value, expires_at)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                evicted_keys.append(self.items.popitem(last=False)[0])
+        self._evicted(evicted_keys)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def _evicted(self, keys: list):
+        if self.on_evict is not None:
+            for key in keys:
+                self.on_evict(key)
+
+    def _is_live(self, key) -> bool:
+        if key not in self.items:
+            return False
+        expires_at = self.items[key][1]
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.items[key]
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,164 @@
+from .LRUCache import LRUCache
+from .CollectionVersionStore import CollectionVersionStore
+from utils.metrics import ANSWER_CACHE_REQUESTS
+from itertools import count
+from threading import Lock
+import numpy as np
+
+
+class ScopeMatrix:
+    """Normalized query vectors of one cache scope, one row per entry.
+
+    Rows live in a float32 matrix that grows by doubling; removed rows are
+    zeroed and reused, so storing and evicting only touch a single row.
+    """
+
+    def __init__(self, initial_rows: int = 16):
+        self.initial_rows = initial_rows
+        self.vectors = None
+        self.keys = []
+        self.rows = {}
+        self.free_rows = []
+
+    def add(self, key, vector: np.ndarray):
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = len(self.keys)
+            if self.vectors is None:
+                self.vectors = np.zeros(
+                    (self.initial_rows, len(vector)), dtype=np.float32
+                )
+            elif row == len(self.vectors):
+                vectors = np.zeros((2 * row, self.vectors.shape[1]), dtype=np.float32)
+                vectors[:row] = self.vectors
+                self.vectors = vectors
+            self.keys.append(None)
+        self.vectors[row] = vector
+        self.keys[row] = key
+        self.rows[key] = row
+
+    def remove(self, key):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self.vectors[row] = 0
+        self.keys[row] = None
+        self.free_rows.append(row)
+
+    def best_match(self, vector: np.ndarray):
+        """Returns the key of the most similar row and its similarity."""
+        if not self.rows:
+            return None, None
+        similarities = self.vectors[: len(self.keys)] @ vector
+        if self.free_rows:
+            similarities[self.free_rows] = -np.inf
+        row = int(np.argmax(similarities))
+        return self.keys[row], float(similarities[row])
+
+
+class SemanticAnswerCache:
+    """Caches RAG answers by query embedding.
+
+    Entries are scoped to a collection, its current version and the search
+    limit. A lookup returns the stored answer of the most similar cached
+    query when their cosine similarity reaches `similarity_threshold`.
+    Entries leave the cache through LRU eviction, TTL expiry, or a version
+    bump of their collection.
+    """
+
+    def __init__(
+        self,
+        version_store: CollectionVersionStore,
+        max_items: int = 5000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.95,
+    ):
+        self.version_store = version_store
+        self.entries = LRUCache(
+            max_items=max_items, ttl_seconds=ttl_seconds, on_evict=self._on_evict
+        )
+        self.similarity_threshold = similarity_threshold
+        # collection name -> (version, {limit: ScopeMatrix})
+        self.scopes = {}
+        # entry key -> the ScopeMatrix holding its query vector
+        self.entry_scopes = {}
+        self.entry_ids = count()
+        self.lock = Lock()
+
+    async def get_scope(self, collection_name: str, limit: int):
+        version = await self.version_store.get_async(collection_name)
+        if version is None:
+            return None
+        return collection_name, version, limit
+
+    def lookup(self, scope: tuple, vector: list):
+        query_vector = self._normalize(vector)
+        matrix = self._get_scope_matrix(scope)
+        while True:
+            with self.lock:
+                key, similarity = matrix.best_match(query_vector)
+            if key is None or similarity < self.similarity_threshold:
+                break
+            value = self.entries.get(key)
+            if value is not None:
+                ANSWER_CACHE_REQUESTS.labels(result="hit").inc()
+                return value
+            # the entry is gone but its row was not dropped yet
+            self._on_evict(key)
+
+        ANSWER_CACHE_REQUESTS.labels(result="miss").inc()
+        return None
+
+    def store(self, scope: tuple, vector: list, value):
+        key = next(self.entry_ids)
+        matrix = self._get_scope_matrix(scope)
+        self.entries.set(key, value)
+        with self.lock:
+            matrix.add(key, self._normalize(vector))
+            self.entry_scopes[key] = matrix
+
+    def clear(self):
+        with self.lock:
+            self.scopes.clear()
+            self.entry_scopes.clear()
+        self.entries.clear()
+
+    def close(self):
+        self.version_store.close()
+
+    async def close_async(self):
+        await self.version_store.close_async()
+
+    def _on_evict(self, key):
+        with self.lock:
+            matrix = self.entry_scopes.pop(key, None)
+            if matrix is not None:
+                matrix.remove(key)
+
+    def _get_scope_matrix(self, scope: tuple) -> ScopeMatrix:
+        collection_name, version, limit = scope
+        stale_keys = []
+        with self.lock:
+            current = self.scopes.get(collection_name)
+            if current is None or current[0] != version:
+                if current is not None:
+                    stale_keys = [
+                        key for matrix in current[1].values() for key in matrix.rows
+                    ]
+                    for key in stale_keys:
+                        self.entry_scopes.pop(key, None)
+                current = (version, {})
+                self.scopes[collection_name] = current
+            matrix = current[1].get(limit)
+            if matrix is None:
+                matrix = current[1][limit] = ScopeMatrix()
+        for key in stale_keys:
+            self.entries.delete(key)
+        return matrix
+
+    @staticmethod
+    def _normalize(vector: list) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
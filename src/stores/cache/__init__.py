@@ -0,0 +1,8 @@
+from .LRUCache import LRUCache
+from .EmbeddingCache import EmbeddingCache
+from .CachedEmbeddingProvider import CachedEmbeddingProvider
+from .AsyncCachedEmbeddingProvider import AsyncCachedEmbeddingProvider
+from .EmbeddingCacheFactory import EmbeddingCacheFactory
+from .CollectionVersionStore import CollectionVersionStore
+from .SemanticAnswerCache import SemanticAnswerCache
+from .AnswerCacheFactory import AnswerCacheFactory
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+
+class AsyncLLMInterface(ABC):
+    """Coroutine counterpart of `LLMInterface` for use inside the FastAPI
+    event loop. Model selection and prompt construction stay synchronous."""
+
+    @abstractmethod
+    def set_generation_model(self, model_id: str):
+        pass
+
+    @abstractmethod
+    def set_embedding_model(self, model_id: str, embedding_size: int = None):
+        pass
+
+    @abstractmethod
+    async def generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> AsyncIterator[str]:
+        pass
+
+    @abstractmethod
+    async def embed_text(self, text: str, document_type: str = None) -> list[float]:
+        pass
+
+    @abstractmethod
+    async def embed_texts(self, texts: list, document_type: str = None) -> list:
+        pass
+
+    @abstractmethod
+    def construct_prompt(self, prompt: str, role: str) -> str:
+        pass
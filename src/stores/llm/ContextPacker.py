@@ -0,0 +1,99 @@
+import logging
+import re
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class ContextPacker:
+    """Fits retrieved documents into a prompt token budget.
+
+    Documents are taken in retrieval order, best first. One whose word
+    shingles are mostly contained in an already selected document (e.g. the
+    overlap between neighbouring chunks) is dropped, and one that does not
+    fit in the remaining budget is skipped. The system and footer prompts
+    are always kept and paid for first.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        dedupe_threshold: float = 0.8,
+        shingle_size: int = 5,
+        encoding_name: str = "cl100k_base",
+    ):
+        self.max_tokens = max_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.shingle_size = max(1, shingle_size)
+        self.logger = logging.getLogger(__name__)
+        self.encoding = self.load_encoding(encoding_name)
+
+    def load_encoding(self, encoding_name: str):
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            # the encoding file is downloaded on first use
+            self.logger.warning(
+                f"Tokenizer {encoding_name} unavailable, estimating tokens: {e}"
+            )
+            return None
+
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def get_shingles(self, text: str) -> set:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            return {tuple(words)}
+        return {
+            tuple(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def is_duplicate(self, shingles: set, selected_shingles: list) -> bool:
+        if not shingles:
+            return True
+        return any(
+            len(shingles & other) / len(shingles) >= self.dedupe_threshold
+            for other in selected_shingles
+        )
+
+    def pack(
+        self, documents: list, fixed_prompts: list, document_overhead: str = ""
+    ) -> list:
+        """Returns the documents that fit, in their original order.
+
+        `document_overhead` is the per-document text the caller wraps each
+        document in (e.g. its rendered template with an empty body).
+        """
+        budget = self.max_tokens - sum(
+            self.count_tokens(prompt) for prompt in fixed_prompts
+        )
+        # +1 for the newline joining document prompts
+        overhead_tokens = self.count_tokens(document_overhead) + 1
+        packed_documents, selected_shingles = [], []
+        for doc in documents:
+            shingles = self.get_shingles(doc.text)
+            if self.is_duplicate(shingles, selected_shingles):
+                continue
+            tokens = self.count_tokens(doc.text) + overhead_tokens
+            if tokens > budget:
+                continue
+            budget -= tokens
+            packed_documents.append(doc)
+            selected_shingles.append(shingles)
+
+        if len(packed_documents) < len(documents):
+            self.logger.info(
+                f"Packed {len(packed_documents)} of {len(documents)} documents "
+                f"into the prompt budget."
+            )
+        return packed_documents
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from .RateLimiter import is_rate_limited
+from typing import Awaitable, Callable, Iterator, List, Optional
+
+
+class EmbeddingBatcher:
+    """Packs texts into provider-sized sub-batches and embeds them in order.
+
+    Batches are bounded by item count and total characters (a cheap proxy for
+    the provider's token budget). A sub-batch that keeps failing is split in
+    half, and the batch size for the rest of the run shrinks with it, growing
+    back once requests succeed again.
+
+    A rate-limited (429) batch is not retried or split: the provider's
+    `RateLimiter` has already retried it, and more, smaller requests would
+    only add to the throttling. The run stops there, leaving the remaining
+    vectors None.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 96,
+        max_chars: int = 100000,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        self.max_items = max(1, max_items)
+        self.max_chars = max(1, max_chars)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.current_max_items = self.max_items
+        self.logger = logging.getLogger(__name__)
+
+    def iter_batches(self, texts: List[str]) -> Iterator[List[int]]:
+        batch, batch_chars = [], 0
+        for idx, text in enumerate(texts):
+            text_chars = len(text)
+            if batch and (
+                len(batch) >= self.current_max_items
+                or batch_chars + text_chars > self.max_chars
+            ):
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append(idx)
+            batch_chars += text_chars
+        if batch:
+            yield batch
+
+    def embed(
+        self,
+        texts: List[str],
+        embed_batch: Callable[[List[str]], List[list]],
+    ) -> List[Optional[list]]:
+        vectors = [None] * len(texts)
+        try:
+            for batch in self.iter_batches(texts):
+                self._embed_batch(texts, batch, embed_batch, vectors)
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            self.logger.error(f"Embedding stopped, rate limited: {e}")
+        return vectors
+
+    def _embed_batch(self, texts, batch, embed_batch, vectors):
+        batch_vectors = self._call_with_retry(
+            embed_batch, [texts[idx] for idx in batch]
+        )
+        if batch_vectors is not None:
+            for idx, vector in zip(batch, batch_vectors):
+                vectors[idx] = vector
+            self._grow()
+            return
+
+        if len(batch) == 1:
+            self.logger.error(f"Failed to embed text at index {batch[0]}.")
+            return
+
+        self._shrink(len(batch))
+        middle = len(batch) // 2
+        self._embed_batch(texts, batch[:middle], embed_batch, vectors)
+        self._embed_batch(texts, batch[middle:], embed_batch, vectors)
+
+    def _call_with_retry(self, embed_batch, batch_texts):
+        for attempt in range(self.max_retries + 1):
+            try:
+                batch_vectors = embed_batch(batch_texts)
+                if batch_vectors and len(batch_vectors) == len(batch_texts):
+                    return batch_vectors
+                self.logger.error(
+                    f"Embedding batch of {len(batch_texts)} returned "
+                    f"{len(batch_vectors) if batch_vectors else 0} vectors."
+                )
+            except Exception as e:
+                if is_rate_limited(e):
+                    raise
+                self.logger.error(
+                    f"Error embedding batch of {len(batch_texts)} "
+                    f"(attempt {attempt + 1}): {e}"
+                )
+            if attempt < self.max_retries:
+                time.sleep(self.retry_backoff * (2**attempt))
+        return None
+
+    async def embed_async(
+        self,
+        texts: List[str],
+        embed_batch: Callable[[List[str]], Awaitable[List[list]]],
+    ) -> List[Optional[list]]:
+        vectors = [None] * len(texts)
+        try:
+            for batch in self.iter_batches(texts):
+                await self._embed_batch_async(texts, batch, embed_batch, vectors)
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            self.logger.error(f"Embedding stopped, rate limited: {e}")
+        return vectors
+
+    async def _embed_batch_async(self, texts, batch, embed_batch, vectors):
+        batch_vectors = await self._call_with_retry_async(
+            embed_batch, [texts[idx] for idx in batch]
+        )
+        if batch_vectors is not None:
+            for idx, vector in zip(batch, batch_vectors):
+                vectors[idx] = vector
+            self._grow()
+            return
+
+        if len(batch) == 1:
+            self.logger.error(f"Failed to embed text at index {batch[0]}.")
+            return
+
+        self._shrink(len(batch))
+        middle = len(batch) // 2
+        await self._embed_batch_async(texts, batch[:middle], embed_batch, vectors)
+        await self._embed_batch_async(texts, batch[middle:], embed_batch, vectors)
+
+    async def _call_with_retry_async(self, embed_batch, batch_texts):
+        for attempt in range(self.max_retries + 1):
+            try:
+                batch_vectors = await embed_batch(batch_texts)
+                if batch_vectors and len(batch_vectors) == len(batch_texts):
+                    return batch_vectors
+                self.logger.error(
+                    f"Embedding batch of {len(batch_texts)} returned "
+                    f"{len(batch_vectors) if batch_vectors else 0} vectors."
+                )
+            except Exception as e:
+                if is_rate_limited(e):
+                    raise
+                self.logger.error(
+                    f"Error embedding batch of {len(batch_texts)} "
+                    f"(attempt {attempt + 1}): {e}"
+                )
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.retry_backoff * (2**attempt))
+        return None
+
+    def _shrink(self, failed_size: int):
+        self.current_max_items = max(1, min(self.current_max_items, failed_size // 2))
+
+    def _grow(self):
+        if self.current_max_items < self.max_items:
+            self.current_max_items = min(self.max_items, self.current_max_items * 2)
@@ -21,6 +21,7 @@ class CoHereEnum(Enum):
     ASSISTANT = "CHATBOT"
     DOCUMENT = "search_document"
     QUERY = "search_query"
+    TEXT_GENERATION = "text-generation"
 
 
 class DocumentTypeEnum(Enum):
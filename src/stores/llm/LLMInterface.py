@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class LLMInterface(ABC):
@@ -21,10 +22,24 @@ class LLMInterface(ABC):
     ) -> str:
         pass
 
+    @abstractmethod
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        chat_history: list = None,
+        temperature: float = None,
+    ) -> Iterator[str]:
+        pass
+
     @abstractmethod
     def embed_text(self, text: str, document_type: str = None) -> list[float]:
         pass
 
+    @abstractmethod
+    def embed_texts(self, texts: list, document_type: str = None) -> list:
+        pass
+
     @abstractmethod
     def construct_prompt(self, prompt: str, role: str) -> str:
         pass
@@ -1,29 +1,127 @@
 import re
+import httpx
 from .LLMEnums import LLMEnum
-from .providers import AzureOpenAIProvider, CohereProvider
+from .RateLimiter import RateLimiter, LocalTokenBucket, RedisTokenBucket
+from .providers import (
+    AzureOpenAIProvider,
+    CohereProvider,
+    AsyncAzureOpenAIProvider,
+    AsyncCohereProvider,
+)
 
 
 class LLMProviderFactory:
     def __init__(self, config: dict):
         self.config = config
+        self.http_client = None
+        self.rate_limit_bucket = None
 
     def create(self, provider: str):
         if provider == LLMEnum.OPENAI.value:
             return AzureOpenAIProvider(
-                api_key=self.config.AZURE_OPENAI_API_KEY,
-                api_base=self.config.AZURE_OPENAI_ENDPOINT,
-                api_version=self.config.AZURE_OPENAI_API_VERSION,
-                default_input_max_chars=self.config.INPUT_DEFAULT_MAX_CHARS,
-                default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE,
+                rate_limiter=self.get_rate_limiter(provider),
+                **self.get_azure_openai_config(),
             )
 
         elif provider == LLMEnum.COHERE.value:
             return CohereProvider(
-                api_key=self.config.COHERE_API_KEY,
-                default_input_max_chars=self.config.INPUT_DEFAULT_MAX_CHARS,
-                default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE,
+                rate_limiter=self.get_rate_limiter(provider),
+                **self.get_cohere_config(),
             )
 
         return None
+
+    def create_async(self, provider: str):
+        # every async provider built by this factory shares one keep-alive pool
+        if provider == LLMEnum.OPENAI.value:
+            return AsyncAzureOpenAIProvider(
+                http_client=self.get_http_client(),
+                rate_limiter=self.get_rate_limiter(provider),
+                **self.get_azure_openai_config(),
+            )
+
+        elif provider == LLMEnum.COHERE.value:
+            return AsyncCohereProvider(
+                http_client=self.get_http_client(),
+                rate_limiter=self.get_rate_limiter(provider),
+                **self.get_cohere_config(),
+            )
+
+        return None
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=self.config.LLM_REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self.http_client
+
+    def get_rate_limiter(self, provider: str) -> RateLimiter:
+        # LLM_RATE_LIMITS keys are "<provider>" or "<provider>:<model_id>"
+        provider_limits = self.config.LLM_RATE_LIMITS.get(provider, {})
+        model_limits = {
+            key.split(":", 1)[1]: limits
+            for key, limits in self.config.LLM_RATE_LIMITS.items()
+            if key.startswith(f"{provider}:")
+        }
+        return RateLimiter(
+            bucket=self.get_rate_limit_bucket(),
+            provider=provider,
+            limits=model_limits,
+            default_rpm=provider_limits.get("rpm", self.config.LLM_RATE_LIMIT_RPM),
+            default_tpm=provider_limits.get("tpm", self.config.LLM_RATE_LIMIT_TPM),
+            max_retries=self.config.LLM_RATE_LIMIT_MAX_RETRIES,
+            max_transient_retries=self.config.LLM_MAX_RETRIES,
+            retry_backoff=self.config.LLM_RATE_LIMIT_BACKOFF,
+            max_backoff=self.config.LLM_RATE_LIMIT_MAX_BACKOFF,
+        )
+
+    def get_rate_limit_bucket(self):
+        # budgets are shared through Redis when there is one, so API and
+        # worker processes pace against the same quota
+        if self.rate_limit_bucket is None:
+            redis_url = self.config.shared_redis_url
+            if redis_url:
+                self.rate_limit_bucket = RedisTokenBucket(redis_url=redis_url)
+            else:
+                self.rate_limit_bucket = LocalTokenBucket()
+        return self.rate_limit_bucket
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        if self.rate_limit_bucket is not None:
+            await self.rate_limit_bucket.close_async()
+            self.rate_limit_bucket = None
+
+    def get_azure_openai_config(self) -> dict:
+        return dict(
+            api_key=self.config.AZURE_OPENAI_API_KEY,
+            api_base=self.config.AZURE_OPENAI_ENDPOINT,
+            api_version=self.config.AZURE_OPENAI_API_VERSION,
+            **self.get_common_config(),
+        )
+
+    def get_cohere_config(self) -> dict:
+        return dict(
+            api_key=self.config.COHERE_API_KEY,
+            **self.get_common_config(),
+        )
+
+    def get_common_config(self) -> dict:
+        return dict(
+            default_input_max_chars=self.config.INPUT_DEFAULT_MAX_CHARS,
+            default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
+            default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE,
+            embedding_batch_max_items=self.config.EMBEDDING_BATCH_MAX_ITEMS,
+            embedding_batch_max_chars=self.config.EMBEDDING_BATCH_MAX_CHARS,
+            embedding_batch_max_retries=self.config.EMBEDDING_BATCH_MAX_RETRIES,
+            request_timeout=self.config.LLM_REQUEST_TIMEOUT,
+            max_retries=self.config.LLM_MAX_RETRIES,
+        )
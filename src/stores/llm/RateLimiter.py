@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import redis
+import redis.asyncio as async_redis
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient_error(error: Exception) -> bool:
+    """5xx/408 responses, timeouts and dropped connections. The SDKs raise
+    their own types for the latter, chained from the httpx error."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code >= 500 or status_code == 408
+    transport_errors = (httpx.TransportError, TimeoutError, ConnectionError)
+    return isinstance(error, transport_errors) or isinstance(
+        error.__cause__, transport_errors
+    )
+
+
+def estimate_tokens(*texts) -> int:
+    # ~4 characters per token is close enough to budget against
+    return sum(len(text) for text in texts if text) // 4 + 1
+
+
+class LocalTokenBucket:
+    """In-process stand-in for `RedisTokenBucket`, shared by the threads of
+    one process only."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(
+        self, key: str, rpm: int, tpm: int, requests: int = 1, tokens: int = 0
+    ) -> float:
+        """Takes the budget and returns 0, or returns the seconds to wait
+        before it can be taken."""
+        now = time.monotonic()
+        with self.lock:
+            available_requests, available_tokens, updated_at = self.buckets.get(
+                key, (rpm or 0, tpm or 0, now)
+            )
+            elapsed = max(0.0, now - updated_at)
+            wait = 0.0
+            if rpm:
+                available_requests = min(rpm, available_requests + elapsed * rpm / 60)
+                if available_requests < requests:
+                    wait = max(wait, (requests - available_requests) * 60 / rpm)
+            if tpm:
+                available_tokens = min(tpm, available_tokens + elapsed * tpm / 60)
+                if available_tokens < tokens:
+                    wait = max(wait, (tokens - available_tokens) * 60 / tpm)
+            if wait == 0:
+                available_requests -= requests
+                available_tokens -= tokens
+            self.buckets[key] = (available_requests, available_tokens, now)
+            return wait
+
+    async def acquire_async(self, *args, **kwargs) -> float:
+        return self.acquire(*args, **kwargs)
+
+    def close(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+
+class RedisTokenBucket:
+    """Request and token buckets kept in Redis, so every API and worker
+    process draws from the same per-minute budget.
+
+    The refill-and-take step runs as one Lua script on the Redis clock.
+    """
+
+    acquire_script = """
+    local now_parts = redis.call('TIME')
+    local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+    local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local requests, tokens = tonumber(ARGV[3]), tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'r', 't', 'ts')
+    local available_requests = tonumber(state[1]) or rpm
+    local available_tokens = tonumber(state[2]) or tpm
+    local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+    local wait = 0
+    if rpm > 0 then
+        available_requests = math.min(rpm, available_requests + elapsed * rpm / 60)
+        if available_requests < requests then
+            wait = math.max(wait, (requests - available_requests) * 60 / rpm)
+        end
+    end
+    if tpm > 0 then
+        available_tokens = math.min(tpm, available_tokens + elapsed * tpm / 60)
+        if available_tokens < tokens then
+            wait = math.max(wait, (tokens - available_tokens) * 60 / tpm)
+        end
+    end
+    if wait == 0 then
+        available_requests = available_requests - requests
+        available_tokens = available_tokens - tokens
+    end
+    redis.call('HSET', KEYS[1], 'r', available_requests, 't', available_tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], 120)
+    return tostring(wait)
+    """
+
+    def __init__(self, redis_url: str, key_prefix: str = "llm_rate_limit:"):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.client = None
+        self.async_client = None
+        self.logger = logging.getLogger(__name__)
+
+    def get_args(self, rpm, tpm, requests, tokens) -> list:
+        return [rpm or 0, tpm or 0, requests, tokens]
+
+    def acquire(
+        self, key: str, rpm: int, tpm: int, requests: int = 1, tokens: int = 0
+    ) -> float:
+        try:
+            if self.client is None:
+                self.client = redis.Redis.from_url(self.redis_url)
+            wait = self.client.eval(
+                self.acquire_script,
+                1,
+                f"{self.key_prefix}{key}",
+                *self.get_args(rpm, tpm, requests, tokens),
+            )
+            return float(wait)
+        except Exception as e:
+            # an unreachable Redis must not stop LLM calls altogether
+            self.logger.error(f"Error acquiring rate limit for {key}: {e}")
+            return 0.0
+
+    async def acquire_async(
+        self, key: str, rpm: int, tpm: int, requests: int = 1, tokens: int = 0
+    ) -> float:
+        try:
+            if self.async_client is None:
+                self.async_client = async_redis.Redis.from_url(self.redis_url)
+            wait = await self.async_client.eval(
+                self.acquire_script,
+                1,
+                f"{self.key_prefix}{key}",
+                *self.get_args(rpm, tpm, requests, tokens),
+            )
+            return float(wait)
+        except Exception as e:
+            self.logger.error(f"Error acquiring rate limit for {key}: {e}")
+            return 0.0
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    async def close_async(self):
+        self.close()
+        if self.async_client is not None:
+            await self.async_client.aclose()
+            self.async_client = None
+
+
+class RateLimiter:
+    """Paces one provider's calls against per-model request and token
+    budgets and retries failed calls with jittered backoff: rate-limited
+    (429) calls up to `max_retries` times, 5xx, timeouts and connection
+    errors up to `max_transient_retries` times. The SDK clients are built
+    without retries of their own, so a call is only retried here.
+
+    `limits` maps `"<model_id>"` to `{"rpm": ..., "tpm": ...}`; models not
+    listed fall back to `default_rpm`/`default_tpm`. A missing budget is
+    not limited.
+    """
+
+    def __init__(
+        self,
+        bucket=None,
+        provider: str = "",
+        limits: dict = None,
+        default_rpm: Optional[int] = None,
+        default_tpm: Optional[int] = None,
+        max_retries: int = 5,
+        max_transient_retries: int = 2,
+        retry_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.bucket = bucket
+        self.provider = provider
+        self.limits = limits or {}
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_retries = max(0, max_retries)
+        self.max_transient_retries = max(0, max_transient_retries)
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.logger = logging.getLogger(__name__)
+
+    def get_budget(self, model_id: str, tokens: int):
+        limits = self.limits.get(model_id, {})
+        rpm = limits.get("rpm", self.default_rpm)
+        tpm = limits.get("tpm", self.default_tpm)
+        # a single call larger than the whole budget could never be admitted
+        if tpm:
+            tokens = min(tokens, tpm)
+        return rpm, tpm, tokens
+
+    def get_jitter(self, wait: float) -> float:
+        return wait + random.uniform(0, min(1.0, wait))
+
+    def acquire(self, model_id: str, tokens: int = 0):
+        rpm, tpm, tokens = self.get_budget(model_id, tokens)
+        if self.bucket is None or not (rpm or tpm):
+            return
+        key = f"{self.provider}:{model_id}"
+        while (wait := self.bucket.acquire(key, rpm, tpm, 1, tokens)) > 0:
+            time.sleep(self.get_jitter(wait))
+
+    async def acquire_async(self, model_id: str, tokens: int = 0):
+        rpm, tpm, tokens = self.get_budget(model_id, tokens)
+        if self.bucket is None or not (rpm or tpm):
+            return
+        key = f"{self.provider}:{model_id}"
+        while (wait := await self.bucket.acquire_async(key, rpm, tpm, 1, tokens)) > 0:
+            await asyncio.sleep(self.get_jitter(wait))
+
+    def is_rate_limited(self, error: Exception) -> bool:
+        return is_rate_limited(error)
+
+    def get_retry_backoff(self, error: Exception, model_id: str, attempts: dict):
+        """Returns the seconds to wait before retrying the failed call, or
+        None when `error` must be raised. Counts the retry in `attempts`."""
+        if self.is_rate_limited(error):
+            kind, max_retries = "rate limited", self.max_retries
+        elif is_transient_error(error):
+            kind, max_retries = "failed", self.max_transient_retries
+        else:
+            return None
+        attempt = attempts.get(kind, 0)
+        if attempt >= max_retries:
+            return None
+        attempts[kind] = attempt + 1
+        backoff = self.get_backoff(attempt, error)
+        self.logger.warning(
+            f"{self.provider} {kind} {model_id}, "
+            f"retrying in {backoff:.1f}s (attempt {attempt + 1}): {error}"
+        )
+        return backoff
+
+    def get_backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after")
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after)) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        # full jitter keeps workers that were throttled together from
+        # retrying together
+        return random.uniform(
+            0, min(self.max_backoff, self.retry_backoff * (2**attempt))
+        )
+
+    def call(self, fn: Callable, model_id: str, tokens: int = 0, **kwargs):
+        attempts = {}
+        while True:
+            self.acquire(model_id=model_id, tokens=tokens)
+            try:
+                return fn(**kwargs)
+            except Exception as e:
+                backoff = self.get_retry_backoff(e, model_id, attempts)
+                if backoff is None:
+                    raise
+                time.sleep(backoff)
+
+    async def call_async(
+        self, fn: Callable[..., Awaitable], model_id: str, tokens: int = 0, **kwargs
+    ):
+        attempts = {}
+        while True:
+            await self.acquire_async(model_id=model_id, tokens=tokens)
+            try:
+                return await fn(**kwargs)
+            except Exception as e:
+                backoff = self.get_retry_backoff(e, model_id, attempts)
+                if backoff is None:
+                    raise
+                await asyncio.sleep(backoff)
@@ -0,0 +1,166 @@
+from ..AsyncLLMInterface import AsyncLLMInterface
+from ..LLMEnums import AzureOpenAIEnum
+from ..RateLimiter import estimate_tokens
+from .AzureOpenAIProvider import AzureOpenAIProvider
+from openai import AsyncAzureOpenAI
+from typing import AsyncIterator
+import httpx
+
+
+class AsyncAzureOpenAIProvider(AzureOpenAIProvider, AsyncLLMInterface):
+    def __init__(self, *args, http_client: httpx.AsyncClient = None, **kwargs):
+        # set before the parent constructor, which calls `create_client`
+        self.http_client = http_client
+        super().__init__(*args, **kwargs)
+
+    def create_client(self):
+        return AsyncAzureOpenAI(
+            api_key=self.api_key,
+            azure_endpoint=self.api_base,
+            api_version=self.api_version,
+            azure_deployment=self.generation_model_id,
+            timeout=self.request_timeout,
+            max_retries=self.max_retries,
+            http_client=self.http_client,
+        )
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> str:
+
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return None
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return None
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        chat_history = chat_history if chat_history is not None else []
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=AzureOpenAIEnum.USER.value)
+        )
+        response = await self.rate_limiter.call_async(
+            self.client.chat.completions.create,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature,
+        )
+        if (
+            not response
+            or not response.choices
+            or len(response.choices) == 0
+            or not response.choices[0].message
+            or not response.choices[0].message.content
+        ):
+            self.logger.error("No response received from Azure OpenAI.")
+            return None
+        return response.choices[0].message.content
+
+    async def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> AsyncIterator[str]:
+
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        chat_history = chat_history if chat_history is not None else []
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=AzureOpenAIEnum.USER.value)
+        )
+        response = await self.rate_limiter.call_async(
+            self.client.chat.completions.create,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        # closing the stream releases the pooled connection if the client hangs up
+        async with response:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def embed_text(self, text: str, document_type: str = None) -> list[float]:
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        response = await self.rate_limiter.call_async(
+            self.client.embeddings.create,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(text),
+            input=text,
+            model=self.embedding_model_id,
+        )
+        if (
+            not response
+            or not response.data
+            or len(response.data) == 0
+            or not response.data[0].embedding
+        ):
+            self.logger.error("No embedding data received from Azure OpenAI.")
+            return None
+        return response.data[0].embedding
+
+    async def embed_texts(self, texts: list, document_type: str = None) -> list:
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        return await self.embedding_batcher.embed_async(
+            texts=[self.process_text(text) for text in texts],
+            embed_batch=self._embed_batch,
+        )
+
+    async def _embed_batch(self, texts: list) -> list:
+        response = await self.rate_limiter.call_async(
+            self.client.embeddings.create,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(*texts),
+            input=texts,
+            model=self.embedding_model_id,
+        )
+        if not response or not response.data:
+            self.logger.error("No embedding data received from Azure OpenAI.")
+            return None
+        return [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
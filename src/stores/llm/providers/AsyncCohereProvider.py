@@ -0,0 +1,156 @@
+from ..AsyncLLMInterface import AsyncLLMInterface
+from ..LLMEnums import CoHereEnum
+from ..RateLimiter import estimate_tokens
+from .CohereProvider import CohereProvider
+from typing import AsyncIterator
+import cohere
+import httpx
+
+
+class AsyncCohereProvider(CohereProvider, AsyncLLMInterface):
+    def __init__(self, *args, http_client: httpx.AsyncClient = None, **kwargs):
+        # set before the parent constructor, which calls `create_client`
+        self.http_client = http_client
+        super().__init__(*args, **kwargs)
+
+    def create_client(self):
+        return cohere.AsyncClient(
+            self.api_key,
+            timeout=self.request_timeout,
+            httpx_client=self.http_client,
+        )
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> str:
+
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return None
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return None
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        response = await self.rate_limiter.call_async(
+            self.client.chat,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+            model=self.generation_model_id,
+            chat_history=chat_history or [],
+            message=prompt.strip(),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            request_options=self.request_options,
+        )
+        if not response or not response.text:
+            self.logger.error("No response from Cohere API.")
+            return None
+        return response.text.strip()
+
+    async def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> AsyncIterator[str]:
+
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        await self.rate_limiter.acquire_async(
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+        )
+        events = self.client.chat_stream(
+            model=self.generation_model_id,
+            chat_history=chat_history or [],
+            message=prompt.strip(),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            request_options=self.request_options,
+        )
+        try:
+            async for event in events:
+                if event.event_type == CoHereEnum.TEXT_GENERATION.value and event.text:
+                    yield event.text
+        finally:
+            await events.aclose()
+
+    async def embed_text(self, text: str, document_type: str = None) -> list[float]:
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        response = await self.rate_limiter.call_async(
+            self.client.embed,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(text),
+            model=self.embedding_model_id,
+            texts=[self.process_text(text)],
+            input_type=self.get_input_type(document_type),
+            embedding_types=["float"],
+            request_options=self.request_options,
+        )
+        if not response or not response.embeddings:
+            self.logger.error("No embedding returned from Cohere API.")
+            return None
+        return response.embeddings.float[0]
+
+    async def embed_texts(self, texts: list, document_type: str = None) -> list:
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        input_type = self.get_input_type(document_type)
+        return await self.embedding_batcher.embed_async(
+            texts=[self.process_text(text) for text in texts],
+            embed_batch=lambda batch: self._embed_batch(batch, input_type),
+        )
+
+    async def _embed_batch(self, texts: list, input_type: str) -> list:
+        response = await self.rate_limiter.call_async(
+            self.client.embed,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(*texts),
+            model=self.embedding_model_id,
+            texts=texts,
+            input_type=input_type,
+            embedding_types=["float"],
+            batching=False,
+            request_options=self.request_options,
+        )
+        if not response or not response.embeddings:
+            self.logger.error("No embedding returned from Cohere API.")
+            return None
+        return response.embeddings.float
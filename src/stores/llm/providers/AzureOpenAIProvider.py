@@ -1,6 +1,9 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import AzureOpenAIEnum
+from ..EmbeddingBatcher import EmbeddingBatcher
+from ..RateLimiter import RateLimiter, estimate_tokens
 from openai import AzureOpenAI
+from typing import Iterator
 import logging
 
 
@@ -13,6 +16,12 @@ class AzureOpenAIProvider(LLMInterface):
         default_input_max_chars: int = 1000,
         default_generation_max_output_tokens: int = 1000,
         default_generation_temperature: float = 0.1,
+        embedding_batch_max_items: int = 96,
+        embedding_batch_max_chars: int = 100000,
+        embedding_batch_max_retries: int = 3,
+        request_timeout: float = 60.0,
+        max_retries: int = 2,
+        rate_limiter: RateLimiter = None,
     ):
         self.api_key = api_key
         self.api_base = api_base
@@ -23,14 +32,30 @@ class AzureOpenAIProvider(LLMInterface):
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
         self.default_generation_temperature = default_generation_temperature
         self.embedding_size = None
-        self.client = AzureOpenAI(
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_transient_retries=max_retries
+        )
+        # every retry goes through `rate_limiter`
+        self.max_retries = 0
+        self.client = self.create_client()
+        self.enums = AzureOpenAIEnum
+        self.embedding_batcher = EmbeddingBatcher(
+            max_items=embedding_batch_max_items,
+            max_chars=embedding_batch_max_chars,
+            max_retries=embedding_batch_max_retries,
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def create_client(self):
+        return AzureOpenAI(
             api_key=self.api_key,
             azure_endpoint=self.api_base,
             api_version=self.api_version,
             azure_deployment=self.generation_model_id,
+            timeout=self.request_timeout,
+            max_retries=self.max_retries,
         )
-        self.enums = AzureOpenAIEnum
-        self.logger = logging.getLogger(__name__)
 
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
@@ -69,7 +94,10 @@ class AzureOpenAIProvider(LLMInterface):
         chat_history.append(
             self.construct_prompt(prompt=prompt, role=AzureOpenAIEnum.USER.value)
         )
-        response = self.client.chat.completions.create(
+        response = self.rate_limiter.call(
+            self.client.chat.completions.create,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
             model=self.generation_model_id,
             messages=chat_history,
             max_tokens=max_output_tokens,
@@ -86,6 +114,50 @@ class AzureOpenAIProvider(LLMInterface):
             return None
         return response.choices[0].message.content
 
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> Iterator[str]:
+
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        chat_history = chat_history if chat_history is not None else []
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=AzureOpenAIEnum.USER.value)
+        )
+        response = self.rate_limiter.call(
+            self.client.chat.completions.create,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        with response:
+            for chunk in response:
+                # Azure sends a leading chunk with no choices (content filter results)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
     def embed_text(self, text: str, document_type: str) -> list[float]:
         if not self.client:
             self.logger.error("Azure OpenAI client is not initialized.")
@@ -93,8 +165,12 @@ class AzureOpenAIProvider(LLMInterface):
         if not self.embedding_model_id:
             self.logger.error("Embedding model ID is not set.")
             return None
-        response = self.client.embeddings.create(
-            input=text, model=self.embedding_model_id
+        response = self.rate_limiter.call(
+            self.client.embeddings.create,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(text),
+            input=text,
+            model=self.embedding_model_id,
         )
         if (
             not response
@@ -106,5 +182,31 @@ class AzureOpenAIProvider(LLMInterface):
             return None
         return response.data[0].embedding
 
+    def embed_texts(self, texts: list, document_type: str = None) -> list:
+        if not self.client:
+            self.logger.error("Azure OpenAI client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        return self.embedding_batcher.embed(
+            texts=[self.process_text(text) for text in texts],
+            embed_batch=self._embed_batch,
+        )
+
+    def _embed_batch(self, texts: list) -> list:
+        response = self.rate_limiter.call(
+            self.client.embeddings.create,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(*texts),
+            input=texts,
+            model=self.embedding_model_id,
+        )
+        if not response or not response.data:
+            self.logger.error("No embedding data received from Azure OpenAI.")
+            return None
+        # the API may return items out of order, `index` is authoritative
+        return [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
+
     def construct_prompt(self, prompt: str, role: str) -> str:
         return {"role": role, "content": prompt}
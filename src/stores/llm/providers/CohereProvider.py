@@ -1,6 +1,9 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import CoHereEnum, DocumentTypeEnum
+from ..EmbeddingBatcher import EmbeddingBatcher
+from ..RateLimiter import RateLimiter, estimate_tokens
 import cohere
+from typing import Iterator
 import logging
 
 
@@ -11,6 +14,12 @@ class CohereProvider(LLMInterface):
         default_input_max_chars: int = 1000,
         default_generation_max_output_tokens: int = 1000,
         default_generation_temperature: float = 0.1,
+        embedding_batch_max_items: int = 96,
+        embedding_batch_max_chars: int = 100000,
+        embedding_batch_max_retries: int = 3,
+        request_timeout: float = 60.0,
+        max_retries: int = 2,
+        rate_limiter: RateLimiter = None,
     ):
         self.api_key = api_key
         self.generation_model_id = None
@@ -19,10 +28,24 @@ class CohereProvider(LLMInterface):
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
         self.default_generation_temperature = default_generation_temperature
         self.embedding_size = None
-        self.client = cohere.Client(self.api_key)
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_transient_retries=max_retries
+        )
+        # every retry goes through `rate_limiter`
+        self.request_options = {"max_retries": 0}
+        self.client = self.create_client()
         self.enums = CoHereEnum
+        self.embedding_batcher = EmbeddingBatcher(
+            max_items=embedding_batch_max_items,
+            max_chars=embedding_batch_max_chars,
+            max_retries=embedding_batch_max_retries,
+        )
         self.logger = logging.getLogger(__name__)
 
+    def create_client(self):
+        return cohere.Client(self.api_key, timeout=self.request_timeout)
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -57,18 +80,61 @@ class CohereProvider(LLMInterface):
             if temperature is not None
             else self.default_generation_temperature
         )
-        response = self.client.chat(
+        response = self.rate_limiter.call(
+            self.client.chat,
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
             model=self.generation_model_id,
             chat_history=chat_history,
-            message=self.process_text(prompt),
+            message=prompt.strip(),
             temperature=temperature,
             max_tokens=max_output_tokens,
+            request_options=self.request_options,
         )
         if not response or not response.text:
             self.logger.error("No response from Cohere API.")
             return None
         return response.text.strip()
 
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = None,
+        temperature: float = None,
+        chat_history: list = None,
+    ) -> Iterator[str]:
+
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return
+        if not self.generation_model_id:
+            self.logger.error("Generation model ID is not set.")
+            return
+        max_output_tokens = (
+            max_output_tokens
+            if max_output_tokens
+            else self.default_generation_max_output_tokens
+        )
+        temperature = (
+            temperature
+            if temperature is not None
+            else self.default_generation_temperature
+        )
+        self.rate_limiter.acquire(
+            model_id=self.generation_model_id,
+            tokens=estimate_tokens(prompt) + max_output_tokens,
+        )
+        for event in self.client.chat_stream(
+            model=self.generation_model_id,
+            chat_history=chat_history or [],
+            message=prompt.strip(),
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            request_options=self.request_options,
+        ):
+            if event.event_type == CoHereEnum.TEXT_GENERATION.value and event.text:
+                yield event.text
+
     def embed_text(self, text: str, document_type: str = None) -> list[float]:
         if not self.client:
             self.logger.error("Cohere client is not initialized.")
@@ -76,19 +142,55 @@ class CohereProvider(LLMInterface):
         if not self.embedding_model_id:
             self.logger.error("Embedding model ID is not set.")
             return None
-        input_type = CoHereEnum.DOCUMENT.value
-        if document_type == DocumentTypeEnum.QUERY.value:
-            input_type = CoHereEnum.QUERY.value
-        response = self.client.embed(
+        response = self.rate_limiter.call(
+            self.client.embed,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(text),
             model=self.embedding_model_id,
             texts=[self.process_text(text)],
-            input_type=input_type,
+            input_type=self.get_input_type(document_type),
             embedding_types=["float"],
+            request_options=self.request_options,
         )
         if not response or not response.embeddings:
             self.logger.error("No embedding returned from Cohere API.")
             return None
         return response.embeddings.float[0]
 
+    def embed_texts(self, texts: list, document_type: str = None) -> list:
+        if not self.client:
+            self.logger.error("Cohere client is not initialized.")
+            return None
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model ID is not set.")
+            return None
+        input_type = self.get_input_type(document_type)
+        return self.embedding_batcher.embed(
+            texts=[self.process_text(text) for text in texts],
+            embed_batch=lambda batch: self._embed_batch(batch, input_type),
+        )
+
+    def _embed_batch(self, texts: list, input_type: str) -> list:
+        response = self.rate_limiter.call(
+            self.client.embed,
+            model_id=self.embedding_model_id,
+            tokens=estimate_tokens(*texts),
+            model=self.embedding_model_id,
+            texts=texts,
+            input_type=input_type,
+            embedding_types=["float"],
+            batching=False,
+            request_options=self.request_options,
+        )
+        if not response or not response.embeddings:
+            self.logger.error("No embedding returned from Cohere API.")
+            return None
+        return response.embeddings.float
+
+    def get_input_type(self, document_type: str = None) -> str:
+        if document_type == DocumentTypeEnum.QUERY.value:
+            return CoHereEnum.QUERY.value
+        return CoHereEnum.DOCUMENT.value
+
     def construct_prompt(self, prompt: str, role: str):
         return {"role": role, "text": prompt}
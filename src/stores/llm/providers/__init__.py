@@ -1,2 +1,4 @@
 from .CohereProvider import CohereProvider
 from .AzureOpenAIProvider import AzureOpenAIProvider
+from .AsyncCohereProvider import AsyncCohereProvider
+from .AsyncAzureOpenAIProvider import AsyncAzureOpenAIProvider
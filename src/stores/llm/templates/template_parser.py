@@ -1,40 +1,77 @@
+from string import Template
+import importlib
 import os
 
 
 class TemplateParser:
+    """Serves prompt templates from `locales/<language>/<group>.py`.
+
+    Every locale module is imported and its `Template`s validated once, when
+    the parser is built; keys missing from the current language resolve to
+    the default language's template ahead of time.
+    """
+
     def __init__(self, language: str = None, default_language="en"):
         self.current_path = os.path.dirname(os.path.abspath(__file__))
         self.default_language = default_language
         self.language = language
+        self.registry = self.load_templates()
+        self.templates = {}
+        self.set_language(language)
+
+    def load_templates(self) -> dict:
+        locales_path = os.path.join(self.current_path, "locales")
+        registry = {}
+        for language in sorted(os.listdir(locales_path)):
+            language_path = os.path.join(locales_path, language)
+            if not os.path.isdir(language_path) or language.startswith("__"):
+                continue
+            registry[language] = {}
+            for file_name in sorted(os.listdir(language_path)):
+                group, extension = os.path.splitext(file_name)
+                if extension != ".py" or group.startswith("__"):
+                    continue
+                module = importlib.import_module(
+                    f"stores.llm.templates.locales.{language}.{group}"
+                )
+                for key, template in vars(module).items():
+                    if not isinstance(template, Template):
+                        continue
+                    if not self.is_valid_template(template):
+                        raise ValueError(
+                            f"Invalid prompt template {language}/{group}.{key}"
+                        )
+                    registry[language][(group, key)] = template
+        return registry
+
+    def is_valid_template(self, template: Template) -> bool:
+        # same check as Template.is_valid(), which needs Python 3.11+
+        return all(
+            match.group("invalid") is None
+            for match in template.pattern.finditer(template.template)
+        )
 
     def set_language(self, language: str):
-        if not language:
-            self.language = self.default_language
-        language_path = os.path.join(self.current_path, "locales", language)
-        if os.path.exists(language_path):
-            self.language = language
-        else:
-            self.language = self.default_language
+        if not language or language not in self.registry:
+            language = self.default_language
+        self.language = language
+        self.templates = {
+            **self.registry.get(self.default_language, {}),
+            **self.registry.get(language, {}),
+        }
 
     def get(self, group: str, key: str, vars: dict = {}):
         if not group or not key:
             return None
-        group_path = os.path.join(
-            self.current_path, "locales", self.language, f"{group}.py"
-        )
-        target_language = self.language
-        if not os.path.exists(group_path):
-            group_path = os.path.join(
-                self.current_path, "locales", self.default_language, f"{group}.py"
-            )
-            target_language = self.default_language
-        if not os.path.exists(group_path):
+        template = self.templates.get((group, key))
+        if template is None:
             return None
-        module = __import__(
-            f"stores.llm.templates.locales.{target_language}.{group}", fromlist={group}
-        )
+        return template.substitute(vars)
 
-        if not module:
-            return None
-        key_attribute = getattr(module, key)
-        return key_attribute.substitute(vars)
+    def render_many(self, group: str, key: str, vars_list: list) -> list:
+        """Renders one template once per item of `vars_list`; an empty list
+        when the template does not exist."""
+        template = self.templates.get((group, key))
+        if template is None:
+            return []
+        return [template.substitute(vars) for vars in vars_list]
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RerankEnums(Enum):
+
+    COHERE = "COHERE"
+    CROSS_ENCODER = "CROSS_ENCODER"
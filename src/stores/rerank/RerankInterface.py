@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+
+
+class RerankInterface(ABC):
+    """Re-scores retrieved documents against the query. Awaited inside the
+    FastAPI event loop; CPU-bound providers run off the loop."""
+
+    @abstractmethod
+    async def rerank(self, query: str, documents: list, top_k: int) -> list:
+        """Returns the `top_k` best `ReterievedDocument`s, best first, with
+        `score` set to the rerank score, or None on failure."""
+        pass
@@ -0,0 +1,44 @@
+from .RerankEnums import RerankEnums
+from .providers import CohereRerankProvider, CrossEncoderRerankProvider
+import logging
+
+
+class RerankProviderFactory:
+
+    def __init__(self, config):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+    def create(self, provider: str, http_client=None, rate_limiter=None):
+        """Returns None when reranking is off or the backend cannot be built,
+        in which case retrieval results go to the prompt unchanged."""
+        try:
+            if provider == RerankEnums.COHERE.value:
+                return CohereRerankProvider(
+                    api_key=self.config.COHERE_API_KEY,
+                    request_timeout=self.config.LLM_REQUEST_TIMEOUT,
+                    max_retries=self.config.LLM_MAX_RETRIES,
+                    http_client=http_client,
+                    rate_limiter=rate_limiter,
+                    **self.get_model_config(),
+                )
+            if provider == RerankEnums.CROSS_ENCODER.value:
+                return CrossEncoderRerankProvider(
+                    batch_size=self.config.RERANK_BATCH_SIZE,
+                    max_length=self.config.RERANK_MAX_LENGTH,
+                    device=self.config.RERANK_DEVICE,
+                    **self.get_model_config(),
+                )
+        except Exception as e:
+            self.logger.error(f"Reranker {provider} disabled: {e}")
+            return None
+
+        if provider:
+            self.logger.warning(f"Unknown rerank backend {provider}, reranking off.")
+        return None
+
+    def get_model_config(self) -> dict:
+        # each provider has its own default model
+        if not self.config.RERANK_MODEL_ID:
+            return {}
+        return {"model_id": self.config.RERANK_MODEL_ID}
@@ -0,0 +1,3 @@
+from .RerankInterface import RerankInterface
+from .RerankEnums import RerankEnums
+from .RerankProviderFactory import RerankProviderFactory
@@ -0,0 +1,51 @@
+from ..RerankInterface import RerankInterface
+from stores.llm.RateLimiter import RateLimiter, estimate_tokens
+import cohere
+import httpx
+import logging
+
+
+class CohereRerankProvider(RerankInterface):
+    def __init__(
+        self,
+        api_key: str,
+        model_id: str = "rerank-multilingual-v3.0",
+        request_timeout: float = 60.0,
+        max_retries: int = 2,
+        http_client: httpx.AsyncClient = None,
+        rate_limiter: RateLimiter = None,
+    ):
+        self.model_id = model_id
+        self.rate_limiter = rate_limiter or RateLimiter(
+            max_transient_retries=max_retries
+        )
+        # every retry goes through `rate_limiter`
+        self.request_options = {"max_retries": 0}
+        self.client = cohere.AsyncClient(
+            api_key, timeout=request_timeout, httpx_client=http_client
+        )
+        self.logger = logging.getLogger(__name__)
+
+    async def rerank(self, query: str, documents: list, top_k: int) -> list:
+        if not documents:
+            return []
+        try:
+            response = await self.rate_limiter.call_async(
+                self.client.rerank,
+                model_id=self.model_id,
+                tokens=estimate_tokens(query, *[doc.text for doc in documents]),
+                model=self.model_id,
+                query=query,
+                documents=[doc.text for doc in documents],
+                top_n=min(top_k, len(documents)),
+                return_documents=False,
+                request_options=self.request_options,
+            )
+        except Exception as e:
+            self.logger.error(f"Error reranking with Cohere: {e}")
+            return None
+        # results come back sorted by relevance, indexing into `documents`
+        return [
+            documents[result.index].model_copy(update={"score": result.relevance_score})
+            for result in response.results
+        ]
@@ -0,0 +1,57 @@
+from ..RerankInterface import RerankInterface
+import asyncio
+import logging
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    CrossEncoder = None
+
+
+class CrossEncoderRerankProvider(RerankInterface):
+    """Local cross-encoder (e.g. `cross-encoder/ms-marco-MiniLM-L-6-v2`).
+
+    All (query, document) pairs of a request are scored in batches of
+    `batch_size` in one worker thread, so the event loop is never blocked.
+    Needs the optional `sentence-transformers` package.
+    """
+
+    def __init__(
+        self,
+        model_id: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 32,
+        max_length: int = 512,
+        device: str = None,
+    ):
+        if CrossEncoder is None:
+            raise ImportError(
+                "sentence-transformers is required for the cross-encoder reranker."
+            )
+        self.model_id = model_id
+        self.batch_size = batch_size
+        # loaded once per process; scoring reuses the model
+        self.model = CrossEncoder(model_id, max_length=max_length, device=device)
+        self.logger = logging.getLogger(__name__)
+
+    def score(self, query: str, documents: list) -> list:
+        return self.model.predict(
+            [(query, doc.text) for doc in documents],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+
+    async def rerank(self, query: str, documents: list, top_k: int) -> list:
+        if not documents:
+            return []
+        try:
+            scores = await asyncio.to_thread(self.score, query, documents)
+        except Exception as e:
+            self.logger.error(f"Error reranking with {self.model_id}: {e}")
+            return None
+        ranked = sorted(
+            zip(scores, documents), key=lambda item: float(item[0]), reverse=True
+        )
+        return [
+            doc.model_copy(update={"score": float(score)})
+            for score, doc in ranked[:top_k]
+        ]
@@ -0,0 +1,2 @@
+from .CohereRerankProvider import CohereRerankProvider
+from .CrossEncoderRerankProvider import CrossEncoderRerankProvider
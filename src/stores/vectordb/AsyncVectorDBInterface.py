@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+
+
+class AsyncVectorDBInterface(ABC):
+    """Coroutine counterpart of `VectorDBInterface` for use inside the
+    FastAPI event loop."""
+
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def disconnect(self):
+        pass
+
+    @abstractmethod
+    async def is_collection_exists(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def list_all_collections(self) -> list:
+        pass
+
+    @abstractmethod
+    async def get_collection_info(self, collection_name: str) -> dict:
+        pass
+
+    @abstractmethod
+    async def delete_collection(self, collection_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        pass
+
+    @abstractmethod
+    async def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        pass
+
+    @abstractmethod
+    async def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int,
+    ) -> list:
+        pass
+
+    @abstractmethod
+    async def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int,
+    ) -> list:
+        """Runs one search per vector in a single call; returns one result
+        list per vector, in input order."""
+        pass
+
+    @abstractmethod
+    async def delete_by_ids(self, collection_name: str, record_ids: list) -> bool:
+        pass
@@ -4,8 +4,21 @@ from enum import Enum
 class VectorDBEnums(Enum):
 
     QDRANT = "Qdrant"
+    PGVECTOR = "PGVECTOR"
+    EMBEDDED = "EMBEDDED"
 
 
 class DistanceMethodEnums(Enum):
     COSINE = "cosine"
     DOT = "dot"
+
+
+class PGVectorIndexTypeEnums(Enum):
+    HNSW = "hnsw"
+    IVFFLAT = "ivfflat"
+
+
+class VectorQuantizationEnums(Enum):
+    NONE = "none"
+    INT8 = "int8"
+    BINARY = "binary"
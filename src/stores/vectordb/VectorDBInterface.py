@@ -31,7 +31,11 @@ class VectorDBInterface(ABC):
 
     @abstractmethod
     def create_collection(
-        self, collection_name: str, embedding_size: int, do_reset: bool = False
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
     ) -> bool:
         pass
 
@@ -66,3 +70,18 @@ class VectorDBInterface(ABC):
         limit: int,
     ) -> list:
         pass
+
+    @abstractmethod
+    def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int,
+    ) -> list:
+        """Runs one search per vector in a single call; returns one result
+        list per vector, in input order."""
+        pass
+
+    @abstractmethod
+    def delete_by_ids(self, collection_name: str, record_ids: list) -> bool:
+        pass
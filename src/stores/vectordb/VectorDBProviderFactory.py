@@ -1,4 +1,11 @@
-from .providers import QdrantDBProvider
+from .providers import (
+    QdrantDBProvider,
+    PGVectorProvider,
+    EmbeddedVectorDBProvider,
+    AsyncQdrantDBProvider,
+    AsyncPGVectorProvider,
+    AsyncVectorDBAdapter,
+)
 from .VectorDBEnums import VectorDBEnums
 from controllers.BaseController import BaseController
 
@@ -10,12 +17,55 @@ class VectorDBProviderFactory:
         self.base_controller = BaseController()
 
     def create(self, proivder: str):
-        if VectorDBEnums.QDRANT.value:
-            # db_path = self.base_controller.get_database_path(
-            #     db_name=self.config.VECTOR_DB_PATH
-            # )
-            return QdrantDBProvider(
-                db_path=self.config.VECTOR_DB_PATH,
-                distance_mthod=self.config.VECTOR_DB_DISTANCE_METHOD,
+        if proivder == VectorDBEnums.PGVECTOR.value:
+            return PGVectorProvider(
+                db_url=self.get_pgvector_db_url(), **self.get_pgvector_config()
             )
-        return None
+        if proivder == VectorDBEnums.EMBEDDED.value:
+            db_path = self.base_controller.get_database_path(
+                db_name=self.config.VECTOR_DB_PATH
+            )
+            return EmbeddedVectorDBProvider(
+                db_path=db_path,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                segment_max_rows=self.config.EMBEDDED_VECTOR_DB_SEGMENT_MAX_ROWS,
+            )
+        # Qdrant remains the default backend
+        return QdrantDBProvider(**self.get_qdrant_config())
+
+    def create_async(self, proivder: str, db_engine=None):
+        """Builds an `AsyncVectorDBInterface` provider. pgvector runs on the
+        given async SQLAlchemy engine; backends without a native async client
+        are wrapped in `AsyncVectorDBAdapter`."""
+        if proivder == VectorDBEnums.PGVECTOR.value:
+            return AsyncPGVectorProvider(
+                db_engine=db_engine, **self.get_pgvector_config()
+            )
+        if proivder == VectorDBEnums.EMBEDDED.value:
+            return AsyncVectorDBAdapter(provider=self.create(proivder))
+        return AsyncQdrantDBProvider(**self.get_qdrant_config())
+
+    def get_qdrant_config(self) -> dict:
+        return {
+            "db_path": self.config.VECTOR_DB_PATH,
+            "distance_mthod": self.config.VECTOR_DB_DISTANCE_METHOD,
+            "quantization_quantile": self.config.VECTOR_DB_QUANTIZATION_QUANTILE,
+            "quantization_always_ram": self.config.VECTOR_DB_QUANTIZATION_ALWAYS_RAM,
+            "quantization_oversampling": self.config.VECTOR_DB_QUANTIZATION_OVERSAMPLING,
+            "quantization_rescore": self.config.VECTOR_DB_QUANTIZATION_RESCORE,
+            "quantization_cache_ttl": self.config.VECTOR_DB_QUANTIZATION_CACHE_TTL,
+        }
+
+    def get_pgvector_config(self) -> dict:
+        return {
+            "distance_method": self.config.VECTOR_DB_DISTANCE_METHOD,
+            "index_type": self.config.PGVECTOR_INDEX_TYPE,
+            "hnsw_m": self.config.PGVECTOR_HNSW_M,
+            "hnsw_ef_construction": self.config.PGVECTOR_HNSW_EF_CONSTRUCTION,
+            "hnsw_ef_search": self.config.PGVECTOR_HNSW_EF_SEARCH,
+            "ivfflat_lists": self.config.PGVECTOR_IVFFLAT_LISTS,
+            "ivfflat_probes": self.config.PGVECTOR_IVFFLAT_PROBES,
+        }
+
+    def get_pgvector_db_url(self) -> str:
+        return self.config.postgres_sync_dsn
@@ -0,0 +1,261 @@
+from ..AsyncVectorDBInterface import AsyncVectorDBInterface
+from ..VectorDBEnums import VectorQuantizationEnums
+from .PGVectorProvider import PGVectorProvider
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from models.db_schemas import ReterievedDocument
+
+
+class AsyncPGVectorProvider(PGVectorProvider, AsyncVectorDBInterface):
+    """pgvector provider running on the application's async SQLAlchemy
+    engine. SQL is shared with `PGVectorProvider`; the engine is owned by
+    the caller and is not disposed on disconnect."""
+
+    def __init__(self, db_engine: AsyncEngine, *args, **kwargs):
+        super().__init__(None, *args, **kwargs)
+        self.db_engine = db_engine
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self):
+        try:
+            self.engine = self.db_engine
+            async with self.engine.begin() as connection:
+                await connection.execute(text(self.get_create_extension_sql()))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error connecting to PGVector: {e}")
+            return False
+
+    async def disconnect(self):
+        self.engine = None
+        return True
+
+    async def is_collection_exists(self, collection_name: str) -> bool:
+        try:
+            async with self.engine.connect() as connection:
+                result = await connection.execute(
+                    text(self.get_table_exists_sql()),
+                    {"table_name": self.get_table_name(collection_name)},
+                )
+                return bool(result.scalar())
+        except Exception as e:
+            self.logger.error(f"Error checking collection existence: {e}")
+            return False
+
+    async def list_all_collections(self) -> list:
+        try:
+            async with self.engine.connect() as connection:
+                rows = await connection.execute(text(self.get_list_tables_sql()))
+                return [row[0][len(self.table_prefix) :] for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error listing collections: {e}")
+            return []
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        try:
+            table_name = self.get_table_name(collection_name)
+            async with self.engine.connect() as connection:
+                result = await connection.execute(
+                    text(self.get_collection_info_sql(table_name)),
+                    {"table_name": table_name},
+                )
+                row = result.one()
+            return {
+                "table_name": table_name,
+                "vectors_count": row.vectors_count,
+                "indexes": row.indexes or [],
+                "distance": self.distance_method,
+                "index_type": self.index_type,
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting collection info: {e}")
+            return {}
+
+    async def delete_collection(self, collection_name: str) -> bool:
+        try:
+            table_name = self.get_table_name(collection_name)
+            async with self.engine.begin() as connection:
+                await connection.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting collection: {e}")
+            return False
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        if await self.is_collection_exists(collection_name):
+            if do_reset:
+                _ = await self.delete_collection(collection_name)
+            else:
+                self.logger.error(
+                    f"Collection {collection_name} already exists and do_reset is False."
+                )
+                return False
+        if quantization and quantization != VectorQuantizationEnums.NONE.value:
+            self.logger.warning(
+                f"Quantization '{quantization}' is not supported by this provider, "
+                "storing full-precision vectors."
+            )
+        try:
+            table_name = self.get_table_name(collection_name)
+            async with self.engine.begin() as connection:
+                await connection.execute(
+                    text(self.get_create_table_sql(table_name, embedding_size))
+                )
+                if not self.is_index_deferred():
+                    await connection.execute(
+                        text(self.get_create_index_sql(table_name))
+                    )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating collection: {e}")
+            return False
+
+    async def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        return await self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    async def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        if metadata is None:
+            metadata = [None] * len(texts)
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+        if not await self.is_collection_exists(collection_name):
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return False
+        upsert_sql = text(self.get_upsert_sql(self.get_table_name(collection_name)))
+        total_records = len(texts)
+        for i in range(0, total_records, batch_size):
+            batch_end = i + batch_size
+            rows = self.to_record_rows(
+                texts[i:batch_end],
+                vectors[i:batch_end],
+                metadata[i:batch_end],
+                record_ids[i:batch_end],
+            )
+            try:
+                async with self.engine.begin() as connection:
+                    await connection.execute(upsert_sql, rows)
+            except Exception as e:
+                self.logger.error(f"Error inserting batch starting at index {i}: {e}")
+                return False
+        await self.build_deferred_index(collection_name)
+        return True
+
+    async def build_deferred_index(self, collection_name: str):
+        if not self.is_index_deferred():
+            return
+        table_name = self.get_table_name(collection_name)
+        params = self.get_deferred_index_params(table_name)
+        try:
+            async with self.engine.begin() as connection:
+                index_exists = await connection.execute(
+                    text(self.get_index_exists_sql()), params
+                )
+                if index_exists.scalar():
+                    return
+                has_min_rows = await connection.execute(
+                    text(self.get_has_min_rows_sql(table_name)), params
+                )
+                if not has_min_rows.scalar():
+                    return
+                await connection.execute(text(self.get_create_index_sql(table_name)))
+        except Exception as e:
+            self.logger.warning(f"Error building index of {collection_name}: {e}")
+
+    async def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            table_name = self.get_table_name(collection_name)
+            async with self.engine.begin() as connection:
+                await connection.execute(text(self.get_search_settings_sql()))
+                result = await connection.execute(
+                    text(self.get_search_sql(table_name)),
+                    {"vector": self.to_vector_literal(vector), "limit": limit},
+                )
+                rows = result.all()
+            if not rows:
+                return None
+            return [
+                ReterievedDocument(
+                    **{
+                        "score": self.to_score(row.distance),
+                        "text": row.text,
+                        "chunk_id": row.id,
+                    }
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            self.logger.error(f"Error searching by vector: {e}")
+            return []
+
+    async def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            table_name = self.get_table_name(collection_name)
+            async with self.engine.begin() as connection:
+                await connection.execute(text(self.get_search_settings_sql()))
+                result = await connection.execute(
+                    text(self.get_batch_search_sql(table_name)),
+                    {
+                        "vectors": [self.to_vector_literal(v) for v in vectors],
+                        "limit": limit,
+                    },
+                )
+                rows = result.all()
+            return self.group_batch_rows(rows, len(vectors))
+        except Exception as e:
+            self.logger.error(f"Error searching by vectors: {e}")
+            return None
+
+    async def delete_by_ids(
+        self, collection_name: str, record_ids: list, batch_size: int = 1000
+    ) -> bool:
+        try:
+            delete_sql = text(
+                self.get_delete_ids_sql(self.get_table_name(collection_name))
+            )
+            async with self.engine.begin() as connection:
+                for i in range(0, len(record_ids), batch_size):
+                    await connection.execute(
+                        delete_sql, {"ids": list(record_ids[i : i + batch_size])}
+                    )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting records: {e}")
+            return False
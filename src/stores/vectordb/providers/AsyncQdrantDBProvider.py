@@ -0,0 +1,227 @@
+from ..AsyncVectorDBInterface import AsyncVectorDBInterface
+from .QdrantDBProvider import QdrantDBProvider
+import logging
+from qdrant_client import AsyncQdrantClient, models
+from models.db_schemas import ReterievedDocument
+
+
+class AsyncQdrantDBProvider(QdrantDBProvider, AsyncVectorDBInterface):
+    """`AsyncQdrantClient` based provider.
+
+    Reuses the configuration and collection/search parameter builders of
+    `QdrantDBProvider`; every interface method is a coroutine.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self):
+        try:
+            self.client = AsyncQdrantClient(url=self.db_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error connecting to QdrantDB: {e}")
+            return False
+
+    async def disconnect(self):
+        if self.client:
+            await self.client.close()
+        self.client = None
+        return True
+
+    async def is_collection_exists(self, collection_name: str) -> bool:
+        try:
+            return await self.client.collection_exists(collection_name)
+        except Exception as e:
+            self.logger.error(f"Error checking collection existence: {e}")
+            return False
+
+    async def list_all_collections(self) -> list:
+        try:
+            return await self.client.get_collections()
+        except Exception as e:
+            self.logger.error(f"Error listing collections: {e}")
+            return []
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        try:
+            collection = await self.client.get_collection(collection_name)
+            return collection.dict()
+        except Exception as e:
+            self.logger.error(f"Error getting collection info: {e}")
+            return {}
+
+    async def delete_collection(self, collection_name: str) -> bool:
+        if await self.is_collection_exists(collection_name):
+            try:
+                await self.client.delete_collection(collection_name)
+                self.quantized_collections.pop(collection_name, None)
+                return True
+            except Exception as e:
+                self.logger.error(f"Error deleting collection: {e}")
+                return False
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        if await self.is_collection_exists(collection_name):
+            if do_reset:
+                _ = await self.delete_collection(collection_name)
+            else:
+                self.logger.error(
+                    f"Collection {collection_name} already exists and do_reset is False."
+                )
+                return False
+        quantization_config = self.get_quantization_config(quantization)
+        try:
+            await self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(
+                    size=embedding_size,
+                    distance=self.distance_mthod,
+                    on_disk=quantization_config is not None,
+                ),
+                quantization_config=quantization_config,
+            )
+            self.set_collection_quantized(
+                collection_name, quantization_config is not None
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating collection: {e}")
+            return False
+
+    async def get_search_params_async(self, collection_name: str):
+        quantized = self.is_collection_quantized(collection_name)
+        if quantized is None:
+            collection = await self.client.get_collection(collection_name)
+            quantized = collection.config.quantization_config is not None
+            self.set_collection_quantized(collection_name, quantized)
+        return self.build_search_params(quantized)
+
+    async def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        return await self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    async def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        if metadata is None:
+            metadata = [None] * len(texts)
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+        total_records = len(texts)
+        for i in range(0, total_records, batch_size):
+            batch_end = i + batch_size
+            batch_points = [
+                models.PointStruct(
+                    id=record_id,
+                    vector=vector,
+                    payload={"text": text, "metadata": meta},
+                )
+                for text, vector, meta, record_id in zip(
+                    texts[i:batch_end],
+                    vectors[i:batch_end],
+                    metadata[i:batch_end],
+                    record_ids[i:batch_end],
+                )
+            ]
+            try:
+                _ = await self.client.upsert(
+                    collection_name=collection_name,
+                    points=batch_points,
+                )
+            except Exception as e:
+                self.logger.error(f"Error inserting batch starting at index {i}: {e}")
+                return False
+        return True
+
+    async def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int = 5,
+    ) -> list:
+        # no collection_exists round trip: a missing collection surfaces as
+        # an error from the search itself
+        try:
+            results = await self.client.search(
+                collection_name=collection_name,
+                query_vector=vector,
+                limit=limit,
+                search_params=await self.get_search_params_async(collection_name),
+            )
+            if not results or len(results) == 0:
+                return None
+            return [
+                ReterievedDocument(
+                    **{
+                        "score": result.score,
+                        "text": result.payload["text"],
+                        "chunk_id": result.id,
+                    }
+                )
+                for result in results
+            ]
+        except Exception as e:
+            self.logger.error(f"Error searching by vector: {e}")
+            return []
+
+    async def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            batch_results = await self.client.search_batch(
+                collection_name=collection_name,
+                requests=self.get_search_requests(
+                    vectors=vectors,
+                    limit=limit,
+                    search_params=await self.get_search_params_async(collection_name),
+                ),
+            )
+            return [self.to_documents(results) for results in batch_results]
+        except Exception as e:
+            self.logger.error(f"Error searching by vectors: {e}")
+            return None
+
+    async def delete_by_ids(
+        self, collection_name: str, record_ids: list, batch_size: int = 1000
+    ) -> bool:
+        try:
+            for i in range(0, len(record_ids), batch_size):
+                await self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(
+                        points=record_ids[i : i + batch_size]
+                    ),
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting records: {e}")
+            return False
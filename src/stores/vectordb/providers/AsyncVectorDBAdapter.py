@@ -0,0 +1,117 @@
+from ..AsyncVectorDBInterface import AsyncVectorDBInterface
+from ..VectorDBInterface import VectorDBInterface
+import asyncio
+
+
+class AsyncVectorDBAdapter(AsyncVectorDBInterface):
+    """Exposes a synchronous provider through `AsyncVectorDBInterface` by
+    running each call in a worker thread."""
+
+    def __init__(self, provider: VectorDBInterface):
+        self.provider = provider
+
+    async def connect(self):
+        return await asyncio.to_thread(self.provider.connect)
+
+    async def disconnect(self):
+        return await asyncio.to_thread(self.provider.disconnect)
+
+    async def is_collection_exists(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(
+            self.provider.is_collection_exists, collection_name
+        )
+
+    async def list_all_collections(self) -> list:
+        return await asyncio.to_thread(self.provider.list_all_collections)
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        return await asyncio.to_thread(
+            self.provider.get_collection_info, collection_name
+        )
+
+    async def delete_collection(self, collection_name: str) -> bool:
+        return await asyncio.to_thread(self.provider.delete_collection, collection_name)
+
+    async def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        return await asyncio.to_thread(
+            self.provider.create_collection,
+            collection_name=collection_name,
+            embedding_size=embedding_size,
+            do_reset=do_reset,
+            quantization=quantization,
+        )
+
+    async def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        return await asyncio.to_thread(
+            self.provider.insert_one,
+            collection_name=collection_name,
+            text=text,
+            vector=vector,
+            metadata=metadata,
+            record_id=record_id,
+        )
+
+    async def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        return await asyncio.to_thread(
+            self.provider.insert_many,
+            collection_name=collection_name,
+            texts=texts,
+            vectors=vectors,
+            metadata=metadata,
+            record_ids=record_ids,
+            batch_size=batch_size,
+        )
+
+    async def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int = 5,
+    ) -> list:
+        return await asyncio.to_thread(
+            self.provider.search_by_vector,
+            collection_name=collection_name,
+            vector=vector,
+            limit=limit,
+        )
+
+    async def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+    ) -> list:
+        return await asyncio.to_thread(
+            self.provider.search_by_vectors,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+        )
+
+    async def delete_by_ids(self, collection_name: str, record_ids: list) -> bool:
+        return await asyncio.to_thread(
+            self.provider.delete_by_ids,
+            collection_name=collection_name,
+            record_ids=record_ids,
+        )
@@ -0,0 +1,611 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums, VectorQuantizationEnums
+from contextlib import contextmanager
+from threading import Lock
+import fcntl
+import json
+import logging
+import os
+import shutil
+import numpy as np
+from models.db_schemas import ReterievedDocument
+
+
+class EmbeddedSegment:
+    """One append-only slice of a collection.
+
+    `<name>.vectors` holds a row-major float32 matrix, `<name>.ids` the int64
+    record ids and `<name>.offsets` the int64 byte offset of each row's
+    payload line in `<name>.payload` (JSON lines with text and metadata).
+    """
+
+    def __init__(self, collection_path: str, name: str, rows: int, dim: int):
+        self.base_path = os.path.join(collection_path, name)
+        self.name = name
+        self.rows = rows
+        self.dim = dim
+        self.vectors = None
+        self.ids = None
+        self.offsets = None
+        self.live = np.ones(rows, dtype=bool)
+        self.open()
+
+    def open(self):
+        if self.rows == 0:
+            self.vectors = np.empty((0, self.dim), dtype=np.float32)
+            self.ids = np.empty(0, dtype=np.int64)
+            self.offsets = np.empty(0, dtype=np.int64)
+            return
+        # only the first `rows` rows are committed; a crashed append may
+        # have left extra bytes at the end of the files
+        self.vectors = np.memmap(
+            f"{self.base_path}.vectors",
+            dtype=np.float32,
+            mode="r",
+            shape=(self.rows, self.dim),
+        )
+        self.ids = np.fromfile(f"{self.base_path}.ids", dtype=np.int64, count=self.rows)
+        self.offsets = np.fromfile(
+            f"{self.base_path}.offsets", dtype=np.int64, count=self.rows
+        )
+
+    def truncate_uncommitted(self) -> int:
+        """Drops bytes a crashed append left past the committed rows and
+        returns the committed payload size."""
+        payload_size = 0
+        if self.rows:
+            last_offset = int(self.offsets[-1])
+            with open(f"{self.base_path}.payload", "rb") as f:
+                f.seek(last_offset)
+                payload_size = last_offset + len(f.readline())
+        for suffix, size in (
+            (".vectors", self.rows * self.dim * 4),
+            (".ids", self.rows * 8),
+            (".offsets", self.rows * 8),
+            (".payload", payload_size),
+        ):
+            path = f"{self.base_path}{suffix}"
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+        return payload_size
+
+    def append(self, vectors: np.ndarray, ids: np.ndarray, payloads: list):
+        payload_path = f"{self.base_path}.payload"
+        offset = self.truncate_uncommitted()
+        offsets = []
+        with open(payload_path, "ab") as f:
+            for payload in payloads:
+                line = (json.dumps(payload, default=str) + "\n").encode("utf-8")
+                offsets.append(offset)
+                f.write(line)
+                offset += len(line)
+        with open(f"{self.base_path}.offsets", "ab") as f:
+            f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+        with open(f"{self.base_path}.ids", "ab") as f:
+            f.write(ids.astype(np.int64).tobytes())
+        with open(f"{self.base_path}.vectors", "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self.rows += len(ids)
+        self.live = np.concatenate([self.live, np.ones(len(ids), dtype=bool)])
+        self.open()
+
+    def read_payload(self, row: int) -> dict:
+        with open(f"{self.base_path}.payload", "rb") as f:
+            f.seek(int(self.offsets[row]))
+            return json.loads(f.readline())
+
+
+class EmbeddedCollection:
+    """`tombstones.bin` holds int64 (record id, row count at delete time)
+    pairs; rows of that id stored before the delete are dead."""
+
+    tombstones_name = "tombstones.bin"
+
+    def __init__(self, path: str, manifest: dict, manifest_mtime: int):
+        self.path = path
+        self.dim = manifest["embedding_size"]
+        self.distance = manifest["distance"]
+        self.next_segment = manifest["next_segment"]
+        self.manifest_mtime = manifest_mtime
+        self.max_id = None
+        self.segments = [
+            EmbeddedSegment(path, segment["name"], segment["rows"], self.dim)
+            for segment in manifest["segments"]
+        ]
+        self.tombstones = self.read_tombstones(manifest.get("tombstones", 0))
+        self.refresh_live()
+
+    def get_tombstones_path(self) -> str:
+        return os.path.join(self.path, self.tombstones_name)
+
+    def read_tombstones(self, count: int) -> np.ndarray:
+        if count == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.fromfile(
+            self.get_tombstones_path(), dtype=np.int64, count=count * 2
+        ).reshape(-1, 2)
+
+    def append_tombstones(self, ids: np.ndarray):
+        path = self.get_tombstones_path()
+        # drop pairs a crashed delete wrote past the committed count
+        committed_size = self.tombstones.nbytes
+        if os.path.exists(path) and os.path.getsize(path) > committed_size:
+            os.truncate(path, committed_size)
+        pairs = np.column_stack(
+            [ids.astype(np.int64), np.full(len(ids), self.total_rows(), np.int64)]
+        )
+        with open(path, "ab") as f:
+            f.write(pairs.tobytes())
+        self.tombstones = np.concatenate([self.tombstones, pairs])
+
+    def total_rows(self) -> int:
+        return sum(segment.rows for segment in self.segments)
+
+    def refresh_live(self):
+        # a record id re-inserted later supersedes its earlier rows
+        if not self.segments:
+            return
+        all_ids = np.concatenate([segment.ids for segment in self.segments])
+        live = np.zeros(len(all_ids), dtype=bool)
+        if len(all_ids):
+            _, last_from_end = np.unique(all_ids[::-1], return_index=True)
+            live[len(all_ids) - 1 - last_from_end] = True
+            self.max_id = int(all_ids.max())
+        if len(self.tombstones) and len(all_ids):
+            deleted_ids, inverse = np.unique(self.tombstones[:, 0], return_inverse=True)
+            deleted_before = np.zeros(len(deleted_ids), dtype=np.int64)
+            np.maximum.at(deleted_before, inverse, self.tombstones[:, 1])
+            match = np.searchsorted(deleted_ids, all_ids)
+            match = np.minimum(match, len(deleted_ids) - 1)
+            live &= ~(
+                (deleted_ids[match] == all_ids)
+                & (np.arange(len(all_ids)) < deleted_before[match])
+            )
+        start = 0
+        for segment in self.segments:
+            segment.live = live[start : start + segment.rows]
+            start += segment.rows
+
+    def to_manifest(self) -> dict:
+        return {
+            "embedding_size": self.dim,
+            "distance": self.distance,
+            "next_segment": self.next_segment,
+            "segments": [
+                {"name": segment.name, "rows": segment.rows}
+                for segment in self.segments
+            ],
+            "tombstones": len(self.tombstones),
+        }
+
+    def live_count(self) -> int:
+        return int(sum(segment.live.sum() for segment in self.segments))
+
+
+class EmbeddedVectorDBProvider(VectorDBInterface):
+    """In-process vector store on memory-mapped NumPy segment files.
+
+    Nothing runs outside the application: vectors are served from the OS
+    page cache, and inserts only ever append to the tail segment.
+    """
+
+    manifest_name = "collection.json"
+
+    def __init__(
+        self, db_path: str, distance_method: str, segment_max_rows: int = 100000
+    ):
+        self.db_path = db_path
+        self.distance_method = distance_method
+        self.segment_max_rows = max(1, segment_max_rows)
+        self.collections = {}
+        self.lock = Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        try:
+            os.makedirs(self.db_path, exist_ok=True)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error opening embedded vector DB: {e}")
+            return False
+
+    def disconnect(self):
+        with self.lock:
+            self.collections = {}
+        return True
+
+    # ---------- storage helpers ----------
+
+    def get_collection_path(self, collection_name: str) -> str:
+        if os.path.sep in collection_name or collection_name.startswith("."):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return os.path.join(self.db_path, collection_name)
+
+    def get_manifest_path(self, collection_name: str) -> str:
+        return os.path.join(
+            self.get_collection_path(collection_name), self.manifest_name
+        )
+
+    @contextmanager
+    def write_lock(self, collection_name: str):
+        # serialises writers across processes sharing the directory
+        lock_path = os.path.join(self.get_collection_path(collection_name), ".lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write_manifest(self, collection_name: str, manifest: dict) -> int:
+        manifest_path = self.get_manifest_path(collection_name)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, manifest_path)
+        return os.stat(manifest_path).st_mtime_ns
+
+    def load_collection(self, collection_name: str):
+        """Returns the cached collection, reloading it if another process
+        committed a newer manifest."""
+        manifest_path = self.get_manifest_path(collection_name)
+        try:
+            manifest_mtime = os.stat(manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            with self.lock:
+                self.collections.pop(collection_name, None)
+            return None
+
+        with self.lock:
+            collection = self.collections.get(collection_name)
+            if collection and collection.manifest_mtime == manifest_mtime:
+                return collection
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            collection = EmbeddedCollection(
+                path=self.get_collection_path(collection_name),
+                manifest=manifest,
+                manifest_mtime=manifest_mtime,
+            )
+            self.collections[collection_name] = collection
+            return collection
+
+    def prepare_vectors(self, vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if self.distance_method == DistanceMethodEnums.COSINE.value:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        return matrix
+
+    def score_segment(self, segment: EmbeddedSegment, query: np.ndarray) -> np.ndarray:
+        # returns "higher is better" scores; euclid is ranked by -distance
+        if self.distance_method in (
+            DistanceMethodEnums.COSINE.value,
+            DistanceMethodEnums.DOT.value,
+        ):
+            return segment.vectors @ query
+        squared_norms = np.einsum("ij,ij->i", segment.vectors, segment.vectors)
+        squared = squared_norms - 2 * (segment.vectors @ query) + query @ query
+        return -np.sqrt(np.maximum(squared, 0))
+
+    def score_segment_batch(
+        self, segment: EmbeddedSegment, queries: np.ndarray
+    ) -> np.ndarray:
+        # (queries, rows) scores from one matrix-matrix product
+        products = queries @ segment.vectors.T
+        if self.distance_method in (
+            DistanceMethodEnums.COSINE.value,
+            DistanceMethodEnums.DOT.value,
+        ):
+            return products
+        squared_norms = np.einsum("ij,ij->i", segment.vectors, segment.vectors)
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        squared = squared_norms[None, :] - 2 * products + query_norms[:, None]
+        return -np.sqrt(np.maximum(squared, 0))
+
+    def to_score(self, score: float) -> float:
+        if self.distance_method in (
+            DistanceMethodEnums.COSINE.value,
+            DistanceMethodEnums.DOT.value,
+        ):
+            return score
+        # euclid is reported as a distance, like the other providers
+        return -score
+
+    # ---------- VectorDBInterface ----------
+
+    def is_collection_exists(self, collection_name: str) -> bool:
+        try:
+            return os.path.exists(self.get_manifest_path(collection_name))
+        except Exception as e:
+            self.logger.error(f"Error checking collection existence: {e}")
+            return False
+
+    def list_all_collections(self) -> list:
+        try:
+            return sorted(
+                name
+                for name in os.listdir(self.db_path)
+                if os.path.exists(self.get_manifest_path(name))
+            )
+        except Exception as e:
+            self.logger.error(f"Error listing collections: {e}")
+            return []
+
+    def get_collection_info(self, collection_name: str) -> dict:
+        try:
+            collection = self.load_collection(collection_name)
+            if collection is None:
+                return {}
+            return {
+                "path": collection.path,
+                "embedding_size": collection.dim,
+                "distance": collection.distance,
+                "segments_count": len(collection.segments),
+                "vectors_count": collection.live_count(),
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting collection info: {e}")
+            return {}
+
+    def delete_collection(self, collection_name: str) -> bool:
+        try:
+            with self.lock:
+                self.collections.pop(collection_name, None)
+            collection_path = self.get_collection_path(collection_name)
+            if os.path.exists(collection_path):
+                shutil.rmtree(collection_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting collection: {e}")
+            return False
+
+    def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        if self.is_collection_exists(collection_name):
+            if do_reset:
+                _ = self.delete_collection(collection_name)
+            else:
+                self.logger.error(
+                    f"Collection {collection_name} already exists and do_reset is False."
+                )
+                return False
+        if quantization and quantization != VectorQuantizationEnums.NONE.value:
+            self.logger.warning(
+                f"Quantization '{quantization}' is not supported by this provider, "
+                "storing full-precision vectors."
+            )
+        try:
+            os.makedirs(self.get_collection_path(collection_name), exist_ok=True)
+            with self.write_lock(collection_name):
+                self.write_manifest(
+                    collection_name,
+                    {
+                        "embedding_size": embedding_size,
+                        "distance": self.distance_method,
+                        "next_segment": 0,
+                        "segments": [],
+                        "tombstones": 0,
+                    },
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating collection: {e}")
+            return False
+
+    def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        return self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        if metadata is None:
+            metadata = [None] * len(texts)
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+        if not self.is_collection_exists(collection_name):
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return False
+        try:
+            matrix = self.prepare_vectors(vectors)
+            ids = np.asarray(record_ids, dtype=np.int64)
+            payloads = [
+                {"id": int(record_id), "text": text, "metadata": meta}
+                for record_id, text, meta in zip(record_ids, texts, metadata)
+            ]
+            with self.write_lock(collection_name):
+                collection = self.load_collection(collection_name)
+                if matrix.shape[1] != collection.dim:
+                    self.logger.error(
+                        f"Vector size {matrix.shape[1]} does not match "
+                        f"collection size {collection.dim}."
+                    )
+                    return False
+
+                # ids above everything stored cannot supersede older rows,
+                # which spares the full liveness pass on ordinary appends
+                supersedes = (
+                    collection.max_id is not None
+                    and int(ids.min()) <= collection.max_id
+                ) or len(np.unique(ids)) != len(ids)
+
+                start = 0
+                while start < len(ids):
+                    tail = collection.segments[-1] if collection.segments else None
+                    if tail is None or tail.rows >= self.segment_max_rows:
+                        tail = EmbeddedSegment(
+                            collection.path,
+                            f"segment_{collection.next_segment:06d}",
+                            0,
+                            collection.dim,
+                        )
+                        collection.next_segment += 1
+                        collection.segments.append(tail)
+                    end = min(len(ids), start + self.segment_max_rows - tail.rows)
+                    tail.append(matrix[start:end], ids[start:end], payloads[start:end])
+                    start = end
+
+                # the manifest swap is the commit point for readers
+                collection.manifest_mtime = self.write_manifest(
+                    collection_name, collection.to_manifest()
+                )
+                if supersedes:
+                    collection.refresh_live()
+                else:
+                    collection.max_id = int(ids.max())
+            return True
+        except Exception as e:
+            self.logger.error(f"Error inserting records: {e}")
+            # in-memory state may be ahead of the manifest; reload next time
+            with self.lock:
+                self.collections.pop(collection_name, None)
+            return False
+
+    def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            collection = self.load_collection(collection_name)
+            if collection is None:
+                self.logger.error(f"Collection {collection_name} does not exist.")
+                return []
+            query = self.prepare_vectors(vector)[0]
+
+            candidates = []
+            for segment in collection.segments:
+                if segment.rows == 0:
+                    continue
+                scores = self.score_segment(segment, query)
+                scores = np.where(segment.live, scores, -np.inf)
+                k = min(limit, segment.rows)
+                top_rows = np.argpartition(-scores, k - 1)[:k]
+                candidates.extend(
+                    (float(scores[row]), segment, int(row))
+                    for row in top_rows
+                    if np.isfinite(scores[row])
+                )
+
+            if not candidates:
+                return None
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            return [
+                ReterievedDocument(
+                    **{
+                        "score": self.to_score(score),
+                        "text": segment.read_payload(row)["text"],
+                        "chunk_id": int(segment.ids[row]),
+                    }
+                )
+                for score, segment, row in candidates[:limit]
+            ]
+        except Exception as e:
+            self.logger.error(f"Error searching by vector: {e}")
+            return []
+
+    def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+        queries_block_size: int = 256,
+    ) -> list:
+        try:
+            collection = self.load_collection(collection_name)
+            if collection is None:
+                self.logger.error(f"Collection {collection_name} does not exist.")
+                return []
+            queries = self.prepare_vectors(vectors)
+
+            candidates = [[] for _ in range(len(queries))]
+            for segment in collection.segments:
+                if segment.rows == 0:
+                    continue
+                k = min(limit, segment.rows)
+                # blocks bound the (queries, rows) score matrix
+                for start in range(0, len(queries), queries_block_size):
+                    scores = self.score_segment_batch(
+                        segment, queries[start : start + queries_block_size]
+                    )
+                    scores = np.where(segment.live[None, :], scores, -np.inf)
+                    top_rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    for offset, rows in enumerate(top_rows):
+                        query_scores = scores[offset]
+                        candidates[start + offset].extend(
+                            (float(query_scores[row]), segment, int(row))
+                            for row in rows
+                            if np.isfinite(query_scores[row])
+                        )
+
+            batch_results = []
+            for query_candidates in candidates:
+                query_candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+                batch_results.append(
+                    [
+                        ReterievedDocument(
+                            **{
+                                "score": self.to_score(score),
+                                "text": segment.read_payload(row)["text"],
+                                "chunk_id": int(segment.ids[row]),
+                            }
+                        )
+                        for score, segment, row in query_candidates[:limit]
+                    ]
+                )
+            return batch_results
+        except Exception as e:
+            self.logger.error(f"Error searching by vectors: {e}")
+            return None
+
+    def delete_by_ids(self, collection_name: str, record_ids: list) -> bool:
+        if not self.is_collection_exists(collection_name):
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return False
+        if not record_ids:
+            return True
+        try:
+            with self.write_lock(collection_name):
+                collection = self.load_collection(collection_name)
+                collection.append_tombstones(np.asarray(record_ids, dtype=np.int64))
+                # the manifest swap commits the tombstones, as with inserts
+                collection.manifest_mtime = self.write_manifest(
+                    collection_name, collection.to_manifest()
+                )
+                collection.refresh_live()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting records: {e}")
+            with self.lock:
+                self.collections.pop(collection_name, None)
+            return False
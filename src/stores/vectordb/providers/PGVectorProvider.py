@@ -0,0 +1,448 @@
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import (
+    DistanceMethodEnums,
+    PGVectorIndexTypeEnums,
+    VectorQuantizationEnums,
+)
+import json
+import logging
+import re
+from sqlalchemy import create_engine, text
+from models.db_schemas import ReterievedDocument
+
+
+class PGVectorProvider(VectorDBInterface):
+    table_prefix = "pgvector_"
+    # IVFFlat trains its lists on the rows present when the index is built,
+    # so the index is deferred until the table holds this many rows per list
+    ivfflat_min_rows_per_list = 39
+
+    def __init__(
+        self,
+        db_url: str,
+        distance_method: str,
+        index_type: str = PGVectorIndexTypeEnums.HNSW.value,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        hnsw_ef_search: int = 40,
+        ivfflat_lists: int = 100,
+        ivfflat_probes: int = 10,
+    ):
+        self.db_url = db_url
+        self.engine = None
+        self.distance_method = distance_method
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_lists = ivfflat_lists
+        self.ivfflat_probes = ivfflat_probes
+        self.logger = logging.getLogger(__name__)
+
+        # (operator, index operator class) per distance; euclid is the fallback
+        if distance_method == DistanceMethodEnums.COSINE.value:
+            self.distance_operator, self.operator_class = "<=>", "vector_cosine_ops"
+        elif distance_method == DistanceMethodEnums.DOT.value:
+            self.distance_operator, self.operator_class = "<#>", "vector_ip_ops"
+        else:
+            self.distance_operator, self.operator_class = "<->", "vector_l2_ops"
+
+    def connect(self):
+        try:
+            self.engine = create_engine(self.db_url, pool_pre_ping=True)
+            with self.engine.begin() as connection:
+                connection.execute(text(self.get_create_extension_sql()))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error connecting to PGVector: {e}")
+            return False
+
+    def disconnect(self):
+        if self.engine:
+            self.engine.dispose()
+        self.engine = None
+        return True
+
+    # ---------- SQL builders, shared with the async provider ----------
+
+    def get_table_name(self, collection_name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9_]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return f"{self.table_prefix}{collection_name}"
+
+    def get_create_extension_sql(self) -> str:
+        return "CREATE EXTENSION IF NOT EXISTS vector"
+
+    def get_table_exists_sql(self) -> str:
+        return "SELECT to_regclass(:table_name) IS NOT NULL"
+
+    def get_list_tables_sql(self) -> str:
+        return (
+            "SELECT tablename FROM pg_tables "
+            f"WHERE tablename LIKE '{self.table_prefix}%' ORDER BY tablename"
+        )
+
+    def get_create_table_sql(self, table_name: str, embedding_size: int) -> str:
+        return (
+            f'CREATE TABLE "{table_name}" ('
+            "id BIGINT PRIMARY KEY, "
+            "text TEXT NOT NULL, "
+            "metadata JSONB, "
+            f"vector vector({int(embedding_size)}) NOT NULL)"
+        )
+
+    def get_index_name(self, table_name: str) -> str:
+        return f"{table_name}_vector_idx"
+
+    def is_index_deferred(self) -> bool:
+        return self.index_type == PGVectorIndexTypeEnums.IVFFLAT.value
+
+    def get_index_exists_sql(self) -> str:
+        return "SELECT to_regclass(:index_name) IS NOT NULL"
+
+    def get_has_min_rows_sql(self, table_name: str) -> str:
+        return (
+            f'SELECT count(*) >= :min_rows FROM (SELECT 1 FROM "{table_name}" '
+            "LIMIT :min_rows) AS sampled_rows"
+        )
+
+    def get_deferred_index_params(self, table_name: str) -> dict:
+        return {
+            "index_name": self.get_index_name(table_name),
+            "min_rows": int(self.ivfflat_lists) * self.ivfflat_min_rows_per_list,
+        }
+
+    def get_create_index_sql(self, table_name: str) -> str:
+        if self.index_type == PGVectorIndexTypeEnums.IVFFLAT.value:
+            method = "ivfflat"
+            options = f"lists = {int(self.ivfflat_lists)}"
+        else:
+            method = "hnsw"
+            options = (
+                f"m = {int(self.hnsw_m)}, "
+                f"ef_construction = {int(self.hnsw_ef_construction)}"
+            )
+        return (
+            f'CREATE INDEX IF NOT EXISTS "{self.get_index_name(table_name)}" '
+            f'ON "{table_name}" USING {method} (vector {self.operator_class}) '
+            f"WITH ({options})"
+        )
+
+    def get_search_settings_sql(self) -> str:
+        # SET LOCAL only lasts for the surrounding transaction
+        if self.index_type == PGVectorIndexTypeEnums.IVFFLAT.value:
+            return f"SET LOCAL ivfflat.probes = {int(self.ivfflat_probes)}"
+        return f"SET LOCAL hnsw.ef_search = {int(self.hnsw_ef_search)}"
+
+    def get_upsert_sql(self, table_name: str) -> str:
+        return (
+            f'INSERT INTO "{table_name}" (id, text, metadata, vector) '
+            "VALUES (:id, :text, CAST(:metadata AS JSONB), "
+            "CAST(CAST(:vector AS TEXT) AS vector)) "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "text = EXCLUDED.text, "
+            "metadata = EXCLUDED.metadata, "
+            "vector = EXCLUDED.vector"
+        )
+
+    def get_search_sql(self, table_name: str) -> str:
+        return (
+            f"SELECT id, text, vector {self.distance_operator} "
+            "CAST(CAST(:vector AS TEXT) AS vector) AS distance "
+            f'FROM "{table_name}" ORDER BY distance LIMIT :limit'
+        )
+
+    def get_batch_search_sql(self, table_name: str) -> str:
+        # one index scan per query vector, all in a single statement
+        return (
+            "SELECT queries.query_no, hits.id, hits.text, hits.distance "
+            "FROM unnest(CAST(:vectors AS TEXT[])) "
+            "WITH ORDINALITY AS queries(vector, query_no) "
+            "CROSS JOIN LATERAL ("
+            f"SELECT id, text, vector {self.distance_operator} "
+            "CAST(queries.vector AS vector) AS distance "
+            f'FROM "{table_name}" ORDER BY distance LIMIT :limit'
+            ") AS hits ORDER BY queries.query_no, hits.distance"
+        )
+
+    def get_delete_ids_sql(self, table_name: str) -> str:
+        return f'DELETE FROM "{table_name}" WHERE id = ANY(:ids)'
+
+    def get_collection_info_sql(self, table_name: str) -> str:
+        return (
+            "SELECT "
+            f'(SELECT count(*) FROM "{table_name}") AS vectors_count, '
+            "(SELECT array_agg(indexdef) FROM pg_indexes "
+            "WHERE tablename = :table_name) AS indexes"
+        )
+
+    # bind values are cast through TEXT so asyncpg does not need a codec for
+    # the `vector` type
+    def to_vector_literal(self, vector: list) -> str:
+        return "[" + ",".join(str(float(value)) for value in vector) + "]"
+
+    def to_record_rows(
+        self, texts: list, vectors: list, metadata: list, record_ids: list
+    ) -> list:
+        return [
+            {
+                "id": record_id,
+                "text": text_value,
+                "metadata": json.dumps(meta) if meta is not None else None,
+                "vector": self.to_vector_literal(vector),
+            }
+            for text_value, vector, meta, record_id in zip(
+                texts, vectors, metadata, record_ids
+            )
+        ]
+
+    def to_score(self, distance: float) -> float:
+        # report "higher is better" scores the way Qdrant does
+        if self.distance_method == DistanceMethodEnums.COSINE.value:
+            return 1 - distance
+        if self.distance_method == DistanceMethodEnums.DOT.value:
+            return -distance
+        return distance
+
+    # ---------- VectorDBInterface ----------
+
+    def is_collection_exists(self, collection_name: str) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                return bool(
+                    connection.execute(
+                        text(self.get_table_exists_sql()),
+                        {"table_name": self.get_table_name(collection_name)},
+                    ).scalar()
+                )
+        except Exception as e:
+            self.logger.error(f"Error checking collection existence: {e}")
+            return False
+
+    def list_all_collections(self) -> list:
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(text(self.get_list_tables_sql()))
+                return [row[0][len(self.table_prefix) :] for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error listing collections: {e}")
+            return []
+
+    def get_collection_info(self, collection_name: str) -> dict:
+        try:
+            table_name = self.get_table_name(collection_name)
+            with self.engine.connect() as connection:
+                row = connection.execute(
+                    text(self.get_collection_info_sql(table_name)),
+                    {"table_name": table_name},
+                ).one()
+            return {
+                "table_name": table_name,
+                "vectors_count": row.vectors_count,
+                "indexes": row.indexes or [],
+                "distance": self.distance_method,
+                "index_type": self.index_type,
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting collection info: {e}")
+            return {}
+
+    def delete_collection(self, collection_name: str) -> bool:
+        try:
+            table_name = self.get_table_name(collection_name)
+            with self.engine.begin() as connection:
+                connection.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting collection: {e}")
+            return False
+
+    def create_collection(
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
+    ) -> bool:
+        if self.is_collection_exists(collection_name):
+            if do_reset:
+                _ = self.delete_collection(collection_name)
+            else:
+                self.logger.error(
+                    f"Collection {collection_name} already exists and do_reset is False."
+                )
+                return False
+        if quantization and quantization != VectorQuantizationEnums.NONE.value:
+            self.logger.warning(
+                f"Quantization '{quantization}' is not supported by this provider, "
+                "storing full-precision vectors."
+            )
+        try:
+            table_name = self.get_table_name(collection_name)
+            with self.engine.begin() as connection:
+                connection.execute(
+                    text(self.get_create_table_sql(table_name, embedding_size))
+                )
+                if not self.is_index_deferred():
+                    connection.execute(text(self.get_create_index_sql(table_name)))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating collection: {e}")
+            return False
+
+    def insert_one(
+        self,
+        collection_name: str,
+        text: str,
+        vector: list,
+        metadata: dict = None,
+        record_id: str = None,
+    ) -> str:
+        return self.insert_many(
+            collection_name=collection_name,
+            texts=[text],
+            vectors=[vector],
+            metadata=[metadata],
+            record_ids=[record_id],
+        )
+
+    def insert_many(
+        self,
+        collection_name: str,
+        texts: list,
+        vectors: list,
+        metadata: list = None,
+        record_ids: list = None,
+        batch_size: int = 50,
+    ) -> list:
+        if metadata is None:
+            metadata = [None] * len(texts)
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+        if not self.is_collection_exists(collection_name):
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return False
+        upsert_sql = text(self.get_upsert_sql(self.get_table_name(collection_name)))
+        total_records = len(texts)
+        for i in range(0, total_records, batch_size):
+            batch_end = i + batch_size
+            rows = self.to_record_rows(
+                texts[i:batch_end],
+                vectors[i:batch_end],
+                metadata[i:batch_end],
+                record_ids[i:batch_end],
+            )
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(upsert_sql, rows)
+            except Exception as e:
+                self.logger.error(f"Error inserting batch starting at index {i}: {e}")
+                return False
+        self.build_deferred_index(collection_name)
+        return True
+
+    def build_deferred_index(self, collection_name: str):
+        """Builds the IVFFlat index once enough rows are loaded to train it;
+        until then searches scan the table exactly."""
+        if not self.is_index_deferred():
+            return
+        table_name = self.get_table_name(collection_name)
+        params = self.get_deferred_index_params(table_name)
+        try:
+            with self.engine.begin() as connection:
+                if connection.execute(
+                    text(self.get_index_exists_sql()), params
+                ).scalar():
+                    return
+                if not connection.execute(
+                    text(self.get_has_min_rows_sql(table_name)), params
+                ).scalar():
+                    return
+                connection.execute(text(self.get_create_index_sql(table_name)))
+        except Exception as e:
+            # e.g. a concurrent insert built it first; retried on the next insert
+            self.logger.warning(f"Error building index of {collection_name}: {e}")
+
+    def search_by_vector(
+        self,
+        collection_name: str,
+        vector: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            table_name = self.get_table_name(collection_name)
+            with self.engine.begin() as connection:
+                connection.execute(text(self.get_search_settings_sql()))
+                rows = connection.execute(
+                    text(self.get_search_sql(table_name)),
+                    {"vector": self.to_vector_literal(vector), "limit": limit},
+                ).all()
+            if not rows:
+                return None
+            return [
+                ReterievedDocument(
+                    **{
+                        "score": self.to_score(row.distance),
+                        "text": row.text,
+                        "chunk_id": row.id,
+                    }
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            self.logger.error(f"Error searching by vector: {e}")
+            return []
+
+    def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+    ) -> list:
+        try:
+            table_name = self.get_table_name(collection_name)
+            with self.engine.begin() as connection:
+                connection.execute(text(self.get_search_settings_sql()))
+                rows = connection.execute(
+                    text(self.get_batch_search_sql(table_name)),
+                    {
+                        "vectors": [self.to_vector_literal(v) for v in vectors],
+                        "limit": limit,
+                    },
+                ).all()
+            return self.group_batch_rows(rows, len(vectors))
+        except Exception as e:
+            self.logger.error(f"Error searching by vectors: {e}")
+            return None
+
+    def group_batch_rows(self, rows: list, vectors_count: int) -> list:
+        batch_results = [[] for _ in range(vectors_count)]
+        for row in rows:
+            # ORDINALITY is 1-based
+            batch_results[row.query_no - 1].append(
+                ReterievedDocument(
+                    **{
+                        "score": self.to_score(row.distance),
+                        "text": row.text,
+                        "chunk_id": row.id,
+                    }
+                )
+            )
+        return batch_results
+
+    def delete_by_ids(
+        self, collection_name: str, record_ids: list, batch_size: int = 1000
+    ) -> bool:
+        try:
+            delete_sql = text(
+                self.get_delete_ids_sql(self.get_table_name(collection_name))
+            )
+            with self.engine.begin() as connection:
+                for i in range(0, len(record_ids), batch_size):
+                    connection.execute(
+                        delete_sql, {"ids": list(record_ids[i : i + batch_size])}
+                    )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting records: {e}")
+            return False
@@ -1,16 +1,34 @@
 from numpy import rec
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMethodEnums
+from ..VectorDBEnums import DistanceMethodEnums, VectorQuantizationEnums
 import logging
+import time
 from qdrant_client import QdrantClient, models
 from models.db_schemas import ReterievedDocument
 
 
 class QdrantDBProvider(VectorDBInterface):
-    def __init__(self, db_path: str, distance_mthod: str):
+    def __init__(
+        self,
+        db_path: str,
+        distance_mthod: str,
+        quantization_quantile: float = 0.99,
+        quantization_always_ram: bool = True,
+        quantization_oversampling: float = 2.0,
+        quantization_rescore: bool = True,
+        quantization_cache_ttl: float = 300,
+    ):
         self.db_path = db_path
         self.distance_mthod = None
         self.client = None
+        self.quantization_quantile = quantization_quantile
+        self.quantization_always_ram = quantization_always_ram
+        self.quantization_oversampling = quantization_oversampling
+        self.quantization_rescore = quantization_rescore
+        # collection name -> (whether it is quantized, expiry); expires so a
+        # collection recreated by another process is re-read
+        self.quantization_cache_ttl = quantization_cache_ttl
+        self.quantized_collections = {}
         self.logger = logging.getLogger(__name__)
         if distance_mthod == DistanceMethodEnums.COSINE.value:
             self.distance_mthod = models.Distance.COSINE
@@ -56,13 +74,18 @@ class QdrantDBProvider(VectorDBInterface):
         if self.is_collection_exists(collection_name):
             try:
                 self.client.delete_collection(collection_name)
+                self.quantized_collections.pop(collection_name, None)
                 return True
             except Exception as e:
                 self.logger.error(f"Error deleting collection: {e}")
                 return False
 
     def create_collection(
-        self, collection_name: str, embedding_size: int, do_reset: bool = False
+        self,
+        collection_name: str,
+        embedding_size: int,
+        do_reset: bool = False,
+        quantization: str = None,
     ) -> bool:
         if self.is_collection_exists(collection_name):
             if do_reset:
@@ -72,18 +95,76 @@ class QdrantDBProvider(VectorDBInterface):
                     f"Collection {collection_name} already exists and do_reset is False."
                 )
                 return False
+        quantization_config = self.get_quantization_config(quantization)
         try:
             self.client.create_collection(
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
-                    size=embedding_size, distance=self.distance_mthod
+                    size=embedding_size,
+                    distance=self.distance_mthod,
+                    # with quantization only the compact copy needs to stay in
+                    # RAM, full-precision vectors are read from disk to rescore
+                    on_disk=quantization_config is not None,
                 ),
+                quantization_config=quantization_config,
+            )
+            self.set_collection_quantized(
+                collection_name, quantization_config is not None
             )
             return True
         except Exception as e:
             self.logger.error(f"Error creating collection: {e}")
             return False
 
+    def get_quantization_config(self, quantization: str = None):
+        if quantization == VectorQuantizationEnums.INT8.value:
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.quantization_quantile,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if quantization == VectorQuantizationEnums.BINARY.value:
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        return None
+
+    def is_collection_quantized(self, collection_name: str):
+        """Cached quantization flag of the collection, None when unknown or
+        expired."""
+        cached = self.quantized_collections.get(collection_name)
+        if cached is None or cached[1] <= time.monotonic():
+            return None
+        return cached[0]
+
+    def set_collection_quantized(self, collection_name: str, quantized: bool):
+        self.quantized_collections[collection_name] = (
+            quantized,
+            time.monotonic() + self.quantization_cache_ttl,
+        )
+
+    def get_search_params(self, collection_name: str):
+        quantized = self.is_collection_quantized(collection_name)
+        if quantized is None:
+            collection = self.client.get_collection(collection_name)
+            quantized = collection.config.quantization_config is not None
+            self.set_collection_quantized(collection_name, quantized)
+        return self.build_search_params(quantized)
+
+    def build_search_params(self, quantized: bool):
+        if not quantized:
+            return None
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=self.quantization_rescore,
+                oversampling=self.quantization_oversampling,
+            )
+        )
+
     def insert_one(
         self,
         collection_name: str,
@@ -164,12 +245,17 @@ class QdrantDBProvider(VectorDBInterface):
                 collection_name=collection_name,
                 query_vector=vector,
                 limit=limit,
+                search_params=self.get_search_params(collection_name),
             )
             if not results or len(results) == 0:
                 return None
             return [
                 ReterievedDocument(
-                    **{"score": result.score, "text": result.payload["text"]}
+                    **{
+                        "score": result.score,
+                        "text": result.payload["text"],
+                        "chunk_id": result.id,
+                    }
                 )
                 for result in results
             ]
@@ -187,3 +273,63 @@ class QdrantDBProvider(VectorDBInterface):
         except Exception as e:
             self.logger.error(f"Error searching by vector: {e}")
             return []
+
+    def search_by_vectors(
+        self,
+        collection_name: str,
+        vectors: list,
+        limit: int = 5,
+    ) -> list:
+        if not self.is_collection_exists(collection_name):
+            self.logger.error(f"Collection {collection_name} does not exist.")
+            return []
+        try:
+            # one request to Qdrant for all the queries
+            batch_results = self.client.search_batch(
+                collection_name=collection_name,
+                requests=self.get_search_requests(
+                    vectors=vectors,
+                    limit=limit,
+                    search_params=self.get_search_params(collection_name),
+                ),
+            )
+            return [self.to_documents(results) for results in batch_results]
+        except Exception as e:
+            self.logger.error(f"Error searching by vectors: {e}")
+            return None
+
+    def get_search_requests(self, vectors: list, limit: int, search_params) -> list:
+        return [
+            models.SearchRequest(
+                vector=vector, limit=limit, params=search_params, with_payload=True
+            )
+            for vector in vectors
+        ]
+
+    def to_documents(self, results: list) -> list:
+        return [
+            ReterievedDocument(
+                **{
+                    "score": result.score,
+                    "text": result.payload["text"],
+                    "chunk_id": result.id,
+                }
+            )
+            for result in results
+        ]
+
+    def delete_by_ids(
+        self, collection_name: str, record_ids: list, batch_size: int = 1000
+    ) -> bool:
+        try:
+            for i in range(0, len(record_ids), batch_size):
+                self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(
+                        points=record_ids[i : i + batch_size]
+                    ),
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting records: {e}")
+            return False
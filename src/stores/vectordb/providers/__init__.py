@@ -1 +1,6 @@
 from .QdrantDBProvider import QdrantDBProvider
+from .PGVectorProvider import PGVectorProvider
+from .EmbeddedVectorDBProvider import EmbeddedVectorDBProvider
+from .AsyncQdrantDBProvider import AsyncQdrantDBProvider
+from .AsyncPGVectorProvider import AsyncPGVectorProvider
+from .AsyncVectorDBAdapter import AsyncVectorDBAdapter
@@ -1,10 +1,18 @@
-from celery_app import celery_app, get_setup_utilities
+from celery_app import (
+    celery_app,
+    get_context_packer,
+    get_worker_utilities,
+    run_worker_task,
+)
+from celery import chord, group
 import asyncio
 import logging
 from models.PorjectDataModel import ProjectDataModel
 from models.ChunkDataModel import ChunkDataModel
 from controllers import NLPController
 from models import ResponseSignal
+from helpers.config import get_settings
+from stores.cache import AnswerCacheFactory
 
 logger = logging.getLogger(
     "celery.task",
@@ -19,91 +27,356 @@ logger = logging.getLogger(
 )
 def index_data_content(self, project_id: int, do_reset: int):
 
-    return asyncio.run(_index_data_content(self, project_id, do_reset))
+    return run_worker_task(_index_data_content(self, project_id, do_reset))
 
 
 async def _index_data_content(task_instance, project_id: int, do_reset: int):
-    db_engine, db_client = None, None
+    project, nlp_controller = None, None
+    version_store = AnswerCacheFactory(get_settings()).create_version_store()
     try:
-        (
-            db_engine,
-            db_client,
-            llm_provider_factory,
-            vector_db_factory,
-            generation_client,
-            embedding_client,
-            vector_db_client,
-            template_parser,
-        ) = await get_setup_utilities()
-        project_data_model = await ProjectDataModel.create_instance(db_client=db_client)
-        project = await project_data_model.get_project_or_create_one(
-            project_id=project_id
+        project, chunk_model, nlp_controller = await _get_indexing_context(
+            task_instance, project_id
         )
-        chunk_model = await ChunkDataModel.create_instance(db_client=db_client)
 
-        if not project:
+        page_size = get_settings().CHUNK_READ_PAGE_SIZE
+        # vector ids are the chunks' primary keys; Postgres tracks which
+        # chunks are indexed and which were deleted since, so a run only
+        # reads that difference
+        # tombstones are deleted from the collection, so it must exist
+        if not nlp_controller.ensure_vector_db_collection(
+            project=project, do_reset=bool(do_reset)
+        ):
+            raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
+        if do_reset:
+            _ = await chunk_model.reset_project_index_state(
+                project_id=project.project_id
+            )
+
+        try:
+            deleted_items_count = await _delete_tombstoned_vectors(
+                chunk_model=chunk_model,
+                nlp_controller=nlp_controller,
+                project=project,
+                page_size=page_size,
+            )
+        except Exception:
             task_instance.update_state(
                 state="FAILURE",
-                meta={"message": ResponseSignal.PROJECT_NOT_FOUND.value},
+                meta={"message": ResponseSignal.INSERT_INTO_DB_ERROR.value},
             )
-            raise Exception(ResponseSignal.PROJECT_NOT_FOUND.value)
-        nlp_controller = NLPController(
-            vector_db_client=vector_db_client,
-            generation_client=generation_client,
-            embedding_client=embedding_client,
-            template_parser=template_parser,
+            raise
+
+        inserted_items_count = await _index_chunk_pages(
+            task_instance=task_instance,
+            nlp_controller=nlp_controller,
+            chunk_model=chunk_model,
+            project=project,
+            chunk_pages=chunk_model.iter_project_chunks(
+                project_id=project.project_id,
+                page_size=page_size,
+                unindexed_only=True,
+            ),
         )
 
-        has_records = True
-        page_no = 1
-        inserted_items_count = 0
-        idx = 0
-        while has_records:
+        return {
+            "message": ResponseSignal.INSERT_INTO_DB_SUCCESS.value,
+            "inserted items count": inserted_items_count,
+            "deleted items count": deleted_items_count,
+        }
 
-            page_chunks = await chunk_model.get_project_chunks(
-                project_id=project.project_id, page_no=page_no
+    except Exception as e:
+        logger.error(f"Error processing project files: {e}")
+        raise
+    finally:
+        # cached answers for this collection are stale once it has been rewritten
+        if version_store and project and nlp_controller:
+            version_store.bump(
+                collection_name=nlp_controller.create_collection_name(
+                    project_id=project.project_id
+                )
             )
-            if len(page_chunks):
-                page_no += 1
-            if not page_chunks or len(page_chunks) == 0:
-                has_records = False
-                break
-            chunk_ids = list(range(idx, idx + len(page_chunks)))
-            idx += len(page_chunks)
-            is_inserted = nlp_controller.index_into_vector_db(
+        if version_store:
+            version_store.close()
+
+
+async def _delete_tombstoned_vectors(
+    chunk_model: ChunkDataModel,
+    nlp_controller: NLPController,
+    project,
+    page_size: int,
+) -> int:
+    """Deletes the vectors of chunks deleted since the last run, a page of
+    tombstones at a time, and returns the count."""
+    deleted_items_count = 0
+    while chunk_ids := await chunk_model.get_chunk_tombstone_ids(
+        project_id=project.project_id, limit=page_size
+    ):
+        if not nlp_controller.delete_from_vector_db(
+            project=project, chunks_ids=chunk_ids
+        ):
+            raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
+        _ = await chunk_model.delete_chunk_tombstones(chunk_ids=chunk_ids)
+        deleted_items_count += len(chunk_ids)
+    return deleted_items_count
+
+
+async def _index_chunk_pages(
+    task_instance,
+    nlp_controller: NLPController,
+    chunk_model: ChunkDataModel,
+    project,
+    chunk_pages,
+) -> int:
+    """Reads, embeds and upserts pages in a pipeline and returns the count.
+
+    Stages are connected by bounded queues, so page N+1 is read and
+    embedded while page N uploads, and a slow stage blocks the ones
+    before it instead of letting pages pile up in memory. Chunks are
+    marked indexed once their page is upserted.
+    """
+    settings = get_settings()
+    embed_workers = max(1, settings.INDEXING_EMBED_CONCURRENCY)
+    upsert_workers = max(1, settings.INDEXING_UPSERT_CONCURRENCY)
+    embed_queue = asyncio.Queue(maxsize=settings.INDEXING_PIPELINE_QUEUE_SIZE)
+    upsert_queue = asyncio.Queue(maxsize=settings.INDEXING_PIPELINE_QUEUE_SIZE)
+    inserted_items_count = 0
+    running_embedders = embed_workers
+
+    if not nlp_controller.ensure_vector_db_collection(project=project):
+        raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
+
+    async def read_pages():
+        async for page_chunks in chunk_pages:
+            await embed_queue.put(page_chunks)
+        for _ in range(embed_workers):
+            await embed_queue.put(None)
+
+    async def embed_pages():
+        nonlocal running_embedders
+        while (page_chunks := await embed_queue.get()) is not None:
+            # provider and vector DB clients are blocking, run them off-loop
+            vectors = await asyncio.to_thread(
+                nlp_controller.embed_chunks, chunks=page_chunks
+            )
+            if vectors is None:
+                raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
+            await upsert_queue.put((page_chunks, vectors))
+        running_embedders -= 1
+        if running_embedders == 0:
+            for _ in range(upsert_workers):
+                await upsert_queue.put(None)
+
+    async def upsert_pages():
+        nonlocal inserted_items_count
+        while (item := await upsert_queue.get()) is not None:
+            page_chunks, vectors = item
+            is_inserted = await asyncio.to_thread(
+                nlp_controller.insert_into_vector_db,
                 project=project,
                 chunks=page_chunks,
-                do_reset=do_reset,
-                chunks_ids=chunk_ids,
+                vectors=vectors,
+                chunks_ids=[chunk.chunk_id for chunk in page_chunks],
             )
             if not is_inserted:
-                task_instance.update_state(
-                    state="FAILURE",
-                    meta={"message": ResponseSignal.INSERT_INTO_DB_ERROR.value},
-                )
                 raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
-
+            _ = await chunk_model.mark_chunks_indexed(
+                chunk_ids=[chunk.chunk_id for chunk in page_chunks]
+            )
             inserted_items_count += len(page_chunks)
-            task_instance(
-                state="SUCCESS",
+            task_instance.update_state(
+                state="PROGRESS",
                 meta={
                     "message": ResponseSignal.INSERT_INTO_DB_SUCCESS.value,
                     "inserted items count": inserted_items_count,
                 },
             )
 
+    stages = [asyncio.create_task(read_pages())]
+    stages += [asyncio.create_task(embed_pages()) for _ in range(embed_workers)]
+    stages += [asyncio.create_task(upsert_pages()) for _ in range(upsert_workers)]
+    done, pending = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+    for stage in pending:
+        stage.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for stage in done:
+        if stage.exception():
+            task_instance.update_state(
+                state="FAILURE",
+                meta={"message": ResponseSignal.INSERT_INTO_DB_ERROR.value},
+            )
+            raise stage.exception()
+    return inserted_items_count
+
+
+async def _iter_chunks_by_ids(
+    chunk_model: ChunkDataModel, chunk_ids: list, page_size: int
+):
+    for i in range(0, len(chunk_ids), page_size):
+        page_chunks = await chunk_model.get_chunks_by_ids(
+            chunk_ids=chunk_ids[i : i + page_size]
+        )
+        if page_chunks:
+            yield page_chunks
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.data_indexing.index_data_content_sharded",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60},
+)
+def index_data_content_sharded(self, project_id: int, do_reset: int):
+    """Splits the chunks to index into shards of up to `INDEXING_SHARD_SIZE`
+    chunk ids, one sub-task each.
+
+    The task is replaced by a chord, so its id resolves to the callback's
+    aggregated result.
+    """
+    plan = run_worker_task(_plan_index_shards(self, project_id, do_reset))
+    callback_kwargs = {
+        "collection_name": plan["collection_name"],
+        "deleted_items_count": plan["deleted items count"],
+    }
+    if not plan["shards"]:
+        return finalize_data_indexing([], **callback_kwargs)
+    return self.replace(
+        chord(
+            group(
+                index_data_shard.s(project_id=project_id, chunk_ids=chunk_ids)
+                for chunk_ids in plan["shards"]
+            ),
+            finalize_data_indexing.s(**callback_kwargs),
+        )
+    )
+
+
+async def _get_indexing_context(task_instance, project_id: int):
+    (
+        db_engine,
+        db_client,
+        llm_provider_factory,
+        vector_db_factory,
+        generation_client,
+        embedding_client,
+        vector_db_client,
+        template_parser,
+    ) = await get_worker_utilities()
+    project_data_model = await ProjectDataModel.create_instance(db_client=db_client)
+    project = await project_data_model.get_project_or_create_one(project_id=project_id)
+    if not project:
+        task_instance.update_state(
+            state="FAILURE",
+            meta={"message": ResponseSignal.PROJECT_NOT_FOUND.value},
+        )
+        raise Exception(ResponseSignal.PROJECT_NOT_FOUND.value)
+    chunk_model = await ChunkDataModel.create_instance(db_client=db_client)
+    nlp_controller = NLPController(
+        vector_db_client=vector_db_client,
+        generation_client=generation_client,
+        embedding_client=embedding_client,
+        template_parser=template_parser,
+        context_packer=get_context_packer(),
+    )
+    return project, chunk_model, nlp_controller
+
+
+async def _plan_index_shards(task_instance, project_id: int, do_reset: int):
+    try:
+        project, chunk_model, nlp_controller = await _get_indexing_context(
+            task_instance, project_id
+        )
+        # shards write concurrently, so the collection must exist beforehand
+        if not nlp_controller.ensure_vector_db_collection(
+            project=project, do_reset=bool(do_reset)
+        ):
+            raise Exception(ResponseSignal.INSERT_INTO_DB_ERROR.value)
+        if do_reset:
+            _ = await chunk_model.reset_project_index_state(
+                project_id=project.project_id
+            )
+        deleted_items_count = await _delete_tombstoned_vectors(
+            chunk_model=chunk_model,
+            nlp_controller=nlp_controller,
+            project=project,
+            page_size=get_settings().CHUNK_READ_PAGE_SIZE,
+        )
+
+        # shards carry their chunk ids, so already indexed chunks interleaved
+        # with new ones do not split them into tiny id ranges
+        shard_size = get_settings().INDEXING_SHARD_SIZE
+        new_chunk_ids = await chunk_model.get_project_chunk_ids(
+            project_id=project.project_id, unindexed_only=True
+        )
+        shards = [
+            new_chunk_ids[i : i + shard_size]
+            for i in range(0, len(new_chunk_ids), shard_size)
+        ]
+
+        return {
+            "collection_name": nlp_controller.create_collection_name(
+                project_id=project.project_id
+            ),
+            "shards": shards,
+            "deleted items count": deleted_items_count,
+        }
+    except Exception as e:
+        logger.error(f"Error planning index shards: {e}")
+        raise
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.data_indexing.index_data_shard",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60},
+)
+def index_data_shard(self, project_id: int, chunk_ids: list):
+    return run_worker_task(_index_data_shard(self, project_id, chunk_ids))
+
+
+async def _index_data_shard(task_instance, project_id: int, chunk_ids: list):
+    try:
+        project, chunk_model, nlp_controller = await _get_indexing_context(
+            task_instance, project_id
+        )
+        inserted_items_count = await _index_chunk_pages(
+            task_instance=task_instance,
+            nlp_controller=nlp_controller,
+            chunk_model=chunk_model,
+            project=project,
+            chunk_pages=_iter_chunks_by_ids(
+                chunk_model=chunk_model,
+                chunk_ids=chunk_ids,
+                page_size=get_settings().CHUNK_READ_PAGE_SIZE,
+            ),
+        )
+
         return {
             "message": ResponseSignal.INSERT_INTO_DB_SUCCESS.value,
             "inserted items count": inserted_items_count,
         }
-
     except Exception as e:
-        logger.error(f"Error processing project files: {e}")
+        logger.error(
+            f"Error indexing chunks {chunk_ids[0]}-{chunk_ids[-1]} "
+            f"of project {project_id}: {e}"
+        )
         raise
-    finally:
-        try:
-            await db_engine.dispose()
-            if vector_db_client:
-                vector_db_client.disconnect()
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+
+
+@celery_app.task(name="tasks.data_indexing.finalize_data_indexing")
+def finalize_data_indexing(
+    shard_results: list, collection_name: str, deleted_items_count: int
+):
+    # cached answers for this collection are stale once it has been rewritten
+    version_store = AnswerCacheFactory(get_settings()).create_version_store()
+    if version_store:
+        version_store.bump(collection_name=collection_name)
+        version_store.close()
+    return {
+        "message": ResponseSignal.INSERT_INTO_DB_SUCCESS.value,
+        "inserted items count": sum(
+            result["inserted items count"] for result in shard_results
+        ),
+        "deleted items count": deleted_items_count,
+        "shards count": len(shard_results),
+    }
@@ -2,10 +2,16 @@ from calendar import c
 from os import name
 
 from annotated_types import T
-from celery_app import celery_app, get_setup_utilities
+from celery_app import celery_app, get_worker_utilities, run_worker_task
 from helpers.config import get_settings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from celery.signals import worker_process_shutdown
+import multiprocessing
+import threading
 import asyncio
 import logging
+import queue
 
 # from time import sleep
 from datetime import datetime
@@ -15,12 +21,48 @@ from models.PorjectDataModel import ProjectDataModel
 from models.AssetsDataModel import AssetsDataModel
 from models.ChunkDataModel import ChunkDataModel
 from controllers import DataController, ProjectController, ProcessController
-from models import ResponseSignal
+from models import ResponseSignal, ChunkBatchEventEnum
 
 logger = logging.getLogger(
     "celery.task",
 )
 
+# one pool and one Manager (serving the tasks' batch queues) per worker
+# process, shared by every task running in it
+_process_pool = None
+_process_manager = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: int, broken_pool: ProcessPoolExecutor = None):
+    """Returns the worker process's pool and Manager. Passing the pool whose
+    `submit` raised `BrokenProcessPool` replaces it with a new one."""
+    global _process_pool, _process_manager
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool is broken_pool:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: forking a worker that runs tasks in threads is unsafe
+            mp_context = multiprocessing.get_context("spawn")
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=mp_context
+            )
+            if _process_manager is None:
+                _process_manager = mp_context.Manager()
+        return _process_pool, _process_manager
+
+
+@worker_process_shutdown.connect
+def shutdown_process_pool(**kwargs):
+    global _process_pool, _process_manager
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_manager is not None:
+            _process_manager.shutdown()
+            _process_manager = None
+
 
 @celery_app.task(
     bind=True,
@@ -36,7 +78,7 @@ def process_project_files(
     overlap_size: int,
     do_reset: int,
 ):
-    return asyncio.run(
+    return run_worker_task(
         _process_project_files(
             self, project_id, file_id, chunk_size, overlap_size, do_reset
         )
@@ -51,7 +93,6 @@ async def _process_project_files(
     overlap_size: int,
     do_reset: int,
 ):
-    db_engine, db_client = None, None
     try:
         (
             db_engine,
@@ -62,7 +103,7 @@ async def _process_project_files(
             embedding_client,
             vector_db_client,
             template_parser,
-        ) = await get_setup_utilities()
+        ) = await get_worker_utilities()
         chunk_model = await ChunkDataModel.create_instance(db_client=db_client)
         project_model = await ProjectDataModel.create_instance(db_client=db_client)
         project = await project_model.get_project_or_create_one(project_id=project_id)
@@ -88,15 +129,15 @@ async def _process_project_files(
                 )
                 raise Exception(ResponseSignal.FILES_NOT_FOUND.value)
 
-            projects_files_ids = {asset_record.asset_id: str(asset_record.asset_name)}
+            project_assets = [asset_record]
 
         else:
             project_assets = await asset_model.get_all_project_assets(
                 asset_project_id=project.project_id, asset_type="application/pdf"
             )
-            projects_files_ids = {
-                asset.asset_id: str(asset.asset_name) for asset in project_assets
-            }
+        projects_files_ids = {
+            asset.asset_id: str(asset.asset_name) for asset in project_assets
+        }
         if len(projects_files_ids) == 0:
             # return JSONResponse(
             #     status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,69 +151,254 @@ async def _process_project_files(
                 meta={"message": ResponseSignal.FILES_NOT_FOUND.value},
             )
             raise Exception(ResponseSignal.FILES_NOT_FOUND.value)
+        settings = get_settings()
         process_controller = ProcessController(project_id=project_id)
-        inserted_count = 0
-        no_files = 0
+        skipped_files = []
+        files_fingerprints = {}
         if do_reset == 1:
-            _ = await chunk_model.delete_chunks_by_project_id(project.project_id)
-        for _id, file_id in projects_files_ids.items():
-            file_content = process_controller.get_file_content(file_id=file_id)
-            if file_content is None or len(file_content) == 0:
-                logger.error(f"Error processing file: {file_id}")
-                continue
+            # only files whose content or chunking parameters changed are
+            # re-chunked; their old chunks are replaced, the rest are kept
+            for asset in project_assets:
+                fingerprint = process_controller.get_processing_fingerprint(
+                    file_id=projects_files_ids[asset.asset_id],
+                    chunk_size=chunk_size,
+                    overlap_size=overlap_size,
+                )
+                asset_config = asset.asset_config or {}
+                if (
+                    fingerprint["content_hash"]
+                    and asset_config.get("processing") == fingerprint
+                ):
+                    skipped_files.append(projects_files_ids.pop(asset.asset_id))
+                    continue
+                files_fingerprints[asset.asset_id] = fingerprint
+                _ = await chunk_model.delete_chunks_by_asset_id(asset_id=asset.asset_id)
 
-            file_chunks = process_controller.process_file_content(
-                file_content=file_content,
-                file_id=file_id,
+        chunk_writer = ChunkBatchWriter(
+            chunk_model=chunk_model,
+            project_id=project.project_id,
+            files_ids=projects_files_ids,
+            asset_model=asset_model,
+            files_fingerprints=files_fingerprints,
+            insert_batch_size=settings.CHUNK_INSERT_BATCH_SIZE,
+        )
+        if settings.FILE_PROCESSING_WORKERS > 1 and len(projects_files_ids) > 1:
+            await _chunk_files_in_pool(
+                chunk_writer=chunk_writer,
+                project_id=project_id,
                 chunk_size=chunk_size,
                 overlap_size=overlap_size,
+                batch_size=settings.FILE_PROCESSING_BATCH_SIZE,
+                max_workers=settings.FILE_PROCESSING_WORKERS,
+            )
+        else:
+            await _chunk_files_sequentially(
+                chunk_writer=chunk_writer,
+                project_id=project_id,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                batch_size=settings.FILE_PROCESSING_BATCH_SIZE,
             )
-            if file_chunks is None or len(file_chunks) == 0:
-                # return JSONResponse(
-                #     status_code=status.HTTP_400_BAD_REQUEST,
-                #     content={
-                #         "status": status.HTTP_400_BAD_REQUEST,
-                #         "message": ResponseSignal.PROCESSING_FAILURE.value,
-                #     },
-                # )
-                logger.error(f"Error processing chunks for file: {file_id}")
-                pass
-            file_chunks_records = [
-                DataChunk(
-                    chunk_text=chunk.page_content,
-                    chunk_metadata=chunk.metadata,
-                    chunk_order=i + 1,
-                    chunk_project_id=project.project_id,
-                    chunk_asset_id=_id,
-                )
-                for i, chunk in enumerate(file_chunks)
-            ]
 
-            inserted_count += await chunk_model.insert_many_chunks(
-                chunks=file_chunks_records
+        if chunk_writer.failed_files and chunk_writer.no_files == 0:
+            task_instance.update_state(
+                state="FAILURE",
+                meta={
+                    "message": ResponseSignal.PROCESSING_FAILURE.value,
+                    "failed_files": chunk_writer.failed_files,
+                },
             )
-            no_files += 1
+            raise Exception(ResponseSignal.PROCESSING_FAILURE.value)
+
         task_instance.update_state(
             state="SUCCESS",
             meta={
                 "message": ResponseSignal.PROCESSING_SUCCESS.value,
-                "total_chunks": inserted_count,
-                "total_files": no_files,
+                "total_chunks": chunk_writer.inserted_count,
+                "total_files": chunk_writer.no_files,
+                "failed_files": chunk_writer.failed_files,
+                "skipped_files": skipped_files,
             },
         )
 
         return {
             "message": ResponseSignal.PROCESSING_SUCCESS.value,
-            "total_chunks": inserted_count,
-            "total_files": no_files,
+            "total_chunks": chunk_writer.inserted_count,
+            "total_files": chunk_writer.no_files,
+            "failed_files": chunk_writer.failed_files,
+            "skipped_files": skipped_files,
         }
     except Exception as e:
         logger.error(f"Error processing project files: {e}")
         raise
-    finally:
+
+
+class ChunkBatchWriter:
+    """Single DB writer for chunk batches coming from one or many files.
+
+    Keeps `chunk_order` continuous per asset and records failed files by
+    name; a failed file's partially written chunks are removed. Finished
+    files get their processing fingerprint (None when unknown) stored on
+    the asset.
+    """
+
+    def __init__(
+        self,
+        chunk_model: ChunkDataModel,
+        project_id: int,
+        files_ids: dict,
+        asset_model: AssetsDataModel = None,
+        files_fingerprints: dict = None,
+        insert_batch_size: int = 1000,
+    ):
+        self.chunk_model = chunk_model
+        self.project_id = project_id
+        self.files_ids = files_ids
+        self.asset_model = asset_model
+        self.files_fingerprints = files_fingerprints or {}
+        self.insert_batch_size = insert_batch_size
+        self.file_counts = {asset_id: 0 for asset_id in files_ids}
+        self.inserted_count = 0
+        self.no_files = 0
+        self.failed_files = {}
+
+    async def write_batch(self, asset_id: int, chunks_batch: list):
+        start_order = self.file_counts[asset_id]
+        file_chunks_records = [
+            {
+                "chunk_text": chunk.page_content,
+                "chunk_metadata": chunk.metadata,
+                "chunk_order": start_order + i + 1,
+                "chunk_project_id": self.project_id,
+                "chunk_asset_id": asset_id,
+            }
+            for i, chunk in enumerate(chunks_batch)
+        ]
+        self.file_counts[asset_id] += await self.chunk_model.bulk_insert_chunks(
+            chunks=file_chunks_records, batch_size=self.insert_batch_size
+        )
+
+    async def finish_file(self, asset_id: int):
+        if self.file_counts[asset_id] == 0:
+            await self.fail_file(asset_id, "no chunks produced")
+            return
+        self.inserted_count += self.file_counts[asset_id]
+        self.no_files += 1
+        await self.set_fingerprint(asset_id, self.files_fingerprints.get(asset_id))
+
+    async def fail_file(self, asset_id: int, error: str):
+        file_id = self.files_ids[asset_id]
+        logger.error(f"Error processing file {file_id}: {error}")
+        self.failed_files[file_id] = error
+        if self.file_counts[asset_id]:
+            await self.chunk_model.delete_chunks_by_asset_id(asset_id=asset_id)
+            self.file_counts[asset_id] = 0
+        await self.set_fingerprint(asset_id, None)
+
+    async def set_fingerprint(self, asset_id: int, fingerprint: dict):
+        if self.asset_model is None:
+            return
+        await self.asset_model.update_asset_config(
+            asset_id=asset_id, asset_config={"processing": fingerprint}
+        )
+
+
+async def _chunk_files_sequentially(
+    chunk_writer: ChunkBatchWriter,
+    project_id: int,
+    chunk_size: int,
+    overlap_size: int,
+    batch_size: int,
+):
+    process_controller = ProcessController(project_id=project_id)
+    for asset_id, file_id in chunk_writer.files_ids.items():
+        # pages are read and chunked lazily; each batch is written and
+        # released before the next one is built
         try:
-            await db_engine.dispose()
-            if vector_db_client:
-                vector_db_client.disconnect()
+            for chunks_batch in process_controller.iter_chunk_batches(
+                file_id=file_id,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                batch_size=batch_size,
+            ):
+                await chunk_writer.write_batch(asset_id, chunks_batch)
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            await chunk_writer.fail_file(asset_id, str(e))
+            continue
+        await chunk_writer.finish_file(asset_id)
+
+
+async def _chunk_files_in_pool(
+    chunk_writer: ChunkBatchWriter,
+    project_id: int,
+    chunk_size: int,
+    overlap_size: int,
+    batch_size: int,
+    max_workers: int,
+):
+    pool, manager = get_process_pool(max_workers=max_workers)
+    # bounded, so parsing stalls when the writer falls behind
+    batches_queue = manager.Queue(maxsize=max_workers * 2)
+    # set when the writer stops early, so workers blocked on the full queue
+    # give up instead of hanging the shared pool
+    abort_event = manager.Event()
+    futures = {}
+    try:
+        for asset_id, file_id in chunk_writer.files_ids.items():
+            file_args = (
+                ProcessController.chunk_file_to_queue,
+                project_id,
+                asset_id,
+                file_id,
+                chunk_size,
+                overlap_size,
+                batch_size,
+                batches_queue,
+                abort_event,
+            )
+            try:
+                future = pool.submit(*file_args)
+            except BrokenProcessPool:
+                # a worker killed mid-task (e.g. OOM) leaves the pool unusable
+                pool, manager = get_process_pool(
+                    max_workers=max_workers, broken_pool=pool
+                )
+                future = pool.submit(*file_args)
+            futures[future] = asset_id
+        pending = set(futures.values())
+        while pending:
+            try:
+                event, asset_id, payload = await asyncio.to_thread(
+                    batches_queue.get, timeout=1
+                )
+            except queue.Empty:
+                # a worker that died hard never sends its closing message
+                for future, asset_id in futures.items():
+                    if asset_id in pending and future.done() and future.exception():
+                        pending.discard(asset_id)
+                        await chunk_writer.fail_file(asset_id, str(future.exception()))
+                continue
+
+            if event == ChunkBatchEventEnum.CHUNKS.value:
+                await chunk_writer.write_batch(asset_id, payload)
+            elif event == ChunkBatchEventEnum.DONE.value:
+                pending.discard(asset_id)
+                await chunk_writer.finish_file(asset_id)
+            elif event == ChunkBatchEventEnum.ERROR.value:
+                pending.discard(asset_id)
+                await chunk_writer.fail_file(asset_id, payload)
+    finally:
+        abort_event.set()
+        for future in futures:
+            future.cancel()
+        await asyncio.to_thread(_drain_queue, batches_queue, list(futures))
+
+
+def _drain_queue(batches_queue, futures: list):
+    # empties the queue until every worker has returned, so none of them
+    # stays blocked on a put
+    while not all(future.done() for future in futures):
+        try:
+            batches_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
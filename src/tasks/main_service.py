@@ -1,4 +1,4 @@
-from celery_app import celery_app
+from celery_app import celery_app, run_worker_task
 from helpers.config import get_settings
 import logging
 
@@ -11,7 +11,7 @@ logger = logging.getLogger("celery.task")
 
 @celery_app.task(bind=True)
 def send_email_report(self, mail_wait_seconds: int = 3):
-    return asyncio.run(_send_email_report(self, mail_wait_seconds))
+    return run_worker_task(_send_email_report(self, mail_wait_seconds))
 
 
 async def _send_email_report(task_instance, mail_wait_seconds: int = 3):
@@ -8,6 +8,12 @@ REQUEST_COUNT = Counter(
     ])  
 REQUEST_LATENCY = Histogram(
     'http_request_duration_seconds', 'HTTP Request Latency', ['method', 'endpoint'])
+EMBEDDING_CACHE_REQUESTS = Counter(
+    'embedding_cache_requests_total', 'Embedding cache lookups', ['tier', 'result'])
+ANSWER_CACHE_REQUESTS = Counter(
+    'answer_cache_requests_total', 'Semantic answer cache lookups', ['result'])
+RERANK_LATENCY = Histogram(
+    'rerank_duration_seconds', 'Rerank stage latency', ['backend'])
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):